@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from aiohttp import web
+
+BENCHMARK_RESULTS_FILENAME = "benchmark_results.jsonl"
+HOST = "127.0.0.1"
+PORT = 8931
+
+
+class StandInSite:
+    # Synthetic repack-games.com plus the pixeldrain, qiwi and 1fichier pages
+    # the validator visits. Games appear in several categories so the frontier
+    # has duplicates to skip, and every response can be delayed or failed.
+    # With a capacity it serves that many requests at a time, queues more
+    # (so latency grows with load) and sheds with 503 past a queue of twice
+    # the capacity, which gives the adaptive concurrency limit a knee to find.
+    def __init__(self, categories, pages, per_page, unique_games, latency_ms, error_rate, capacity=0, seed=0):
+        self.categories = categories
+        self.pages = pages
+        self.per_page = per_page
+        self.unique_games = unique_games
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.slots = None
+        self.queued = 0
+        self.random = random.Random(seed)
+        self.base = f"http://{HOST}:{PORT}"
+
+    def game_id(self, category, page, item):
+        return ((category * self.pages + page - 1) * self.per_page + item) % self.unique_games
+
+    def category_page(self, category):
+        return (f'<a class="last" href="{self.base}/category/cat-{category}/page/{self.pages}">Last »</a>')
+
+    def listing_page(self, category, page):
+        items = "".join(self.listing_item(self.game_id(category, page, item)) for item in range(self.per_page))
+        return f'<div class="articles-content"><ul>{items}</ul></div>'
+
+    def listing_item(self, game):
+        return (f'<li><a href="{self.base}/game/{game}"><h2>Stand-in Game {game} Free Download</h2></a>'
+                f'<div class="time-article updated"><a>{1 + game % 28} days ago</a></div></li>')
+
+    def sitemap_index(self):
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'<sitemap><loc>{self.base}/post-sitemap.xml</loc><lastmod>{datetime.now().isoformat()}</lastmod></sitemap>'
+                f'<sitemap><loc>{self.base}/category-sitemap.xml</loc></sitemap>'
+                '</sitemapindex>')
+
+    def post_sitemap(self):
+        urls = "".join(
+            f'<url><loc>{self.base}/game/{game}</loc>'
+            f'<lastmod>{(datetime.now() - timedelta(days=1 + game % 28)).isoformat()}</lastmod></url>'
+            for game in range(self.unique_games)
+        )
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+    def detail_page(self, game):
+        return (
+            f'<h1 class="entry-title">Stand-in Game {game} Free Download</h1>'
+            f'<p>Storage: {1 + game % 90} GB available space</p>'
+            f'<div class="time-article updated"><a>{1 + game % 28} days ago</a></div>'
+            f'<a href="{self.base}/pixeldrain.com/u/pd{game}">pixeldrain</a>'
+            f'<a href="{self.base}/qiwi.gg/file/qw{game}">qiwi</a>'
+            f'<a href="{self.base}/1fichier.com/?f{game}">1fichier</a>'
+        )
+
+    async def handle(self, request):
+        if not self.capacity:
+            return await self.respond(request)
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.capacity)
+        if self.queued >= 3 * self.capacity:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        self.queued += 1
+        try:
+            async with self.slots:
+                return await self.respond(request)
+        finally:
+            self.queued -= 1
+
+    async def respond(self, request):
+        if self.latency:
+            await asyncio.sleep(self.random.expovariate(1 / self.latency))
+        if self.random.random() < self.error_rate:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+
+        path = request.path
+        match = re.match(r"/pixeldrain\.com/api/file/([^/]+)/info$", path)
+        if match:
+            infos = [{"id": file_id, "name": f"{file_id}.zip", "size": 3 * 1073741824}
+                     for file_id in match.group(1).split(",")]
+            return web.json_response(infos if len(infos) > 1 else infos[0])
+        if path.startswith("/pixeldrain.com/") or path.startswith("/1fichier.com/"):
+            return web.Response(text="<html><body>Ready to download</body></html>", content_type="text/html")
+        if path.startswith("/qiwi.gg/"):
+            return web.Response(text="<span>Download 1 - 2.50 GB</span>", content_type="text/html")
+
+        if path == "/sitemap_index.xml":
+            return web.Response(text=self.sitemap_index(), content_type="application/xml")
+        if path == "/post-sitemap.xml":
+            return web.Response(text=self.post_sitemap(), content_type="application/xml")
+
+        match = re.match(r"/game/(\d+)$", path)
+        if match:
+            return web.Response(text=self.detail_page(int(match.group(1))), content_type="text/html")
+        match = re.match(r"/category/cat-(\d+)/+page/(\d+)$", path)
+        if match:
+            return web.Response(text=self.listing_page(int(match.group(1)), int(match.group(2))), content_type="text/html")
+        match = re.match(r"/category/cat-(\d+)/?$", path)
+        if match:
+            return web.Response(text=self.category_page(int(match.group(1))), content_type="text/html")
+        return web.Response(status=404)
+
+    def serve(self):
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self.handle)
+        app.router.add_route("HEAD", "/{tail:.*}", self.handle)
+        web.run_app(app, host=HOST, port=PORT, print=None)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def concurrency_summary(limit, points=20):
+    # Final and peak limit plus up to `points` (seconds, limit) samples of its
+    # trajectory, enough to see where it converged.
+    step = max(1, len(limit.history) // points)
+    trajectory = limit.history[::step]
+    if trajectory[-1] != limit.history[-1]:
+        trajectory.append(limit.history[-1])
+    return {
+        "final": int(limit.limit),
+        "peak": limit.peak,
+        "decreases": limit.decreases,
+        "requests": limit.requests,
+        "trajectory": trajectory
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_scraper(site, discovery="full"):
+    # Imported here so the module-level settings point at the stand-in before
+    # the scraper and its helpers are used.
+    import discovery as discovery_module
+    import engine
+    import hosts
+    import pixeldrain
+    import scraper
+    from logs import log
+    from records import GameRecord
+
+    log.configure(quiet=True)
+    hosts.HOST_LIMITS[HOST] = (engine.CONCURRENT_REQUESTS, 10000)
+    pixeldrain.PIXELDRAIN_API = f"{site.base}/pixeldrain.com/api/file/"
+    discovery_module.SITE_URL = site.base
+    discovery_module.SITEMAP_URLS = [f"{site.base}/sitemap_index.xml"]
+    discovery_module.FEED_URLS = []
+    scraper.BASE_URLS = [f"{site.base}/category/cat-{category}/" for category in range(site.categories)]
+
+    latencies = []
+    fetch_response = engine.fetch_response
+
+    async def timed_fetch_response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fetch_response(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    engine.fetch_response = timed_fetch_response
+
+    limiters = []
+
+    def recorded_limiter(*args, **kwargs):
+        limiters.append(hosts.HostLimiter(*args, **kwargs))
+        return limiters[-1]
+
+    engine.HostLimiter = recorded_limiter
+
+    start = time.perf_counter()
+    await scraper.scrape_games(discovery=discovery)
+    scrape_seconds = time.perf_counter() - start
+
+    with open(scraper.JSON_FILENAME, 'r', encoding='utf-8') as f:
+        games = json.load(f)["downloads"]
+
+    start = time.perf_counter()
+    async with engine.Engine() as validation_engine:
+        await scraper.validate_links(validation_engine, [GameRecord.from_entry(game) for game in games])
+    validate_seconds = time.perf_counter() - start
+    log.close()
+
+    return {
+        "pages": len(latencies),
+        "games": len(games),
+        "links": sum(len(game["uris"]) for game in games),
+        "scrape_seconds": round(scrape_seconds, 3),
+        "validate_seconds": round(validate_seconds, 3),
+        "pages_per_second": round(len(latencies) / scrape_seconds, 2),
+        "games_per_second": round(len(games) / scrape_seconds, 2),
+        "fetch_p50_ms": round(percentile(latencies, 0.5) * 1000, 2) if latencies else None,
+        "fetch_p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "concurrency": [concurrency_summary(limiter.total) for limiter in limiters if limiter.total.requests]
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark scraper.py against a local stand-in site")
+    arg_parser.add_argument("--categories", type=int, default=5)
+    arg_parser.add_argument("--pages", type=int, default=10, help="listing pages per category")
+    arg_parser.add_argument("--per-page", type=int, default=20, help="games per listing page")
+    arg_parser.add_argument("--unique-games", type=int, default=600, help="distinct games shared by all categories")
+    arg_parser.add_argument("--latency-ms", type=float, default=20, help="mean response delay")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of responses that are 503")
+    arg_parser.add_argument("--capacity", type=int, default=25,
+                            help="requests the stand-in serves at once before queueing (0 for unlimited)")
+    arg_parser.add_argument("--discovery", choices=["full", "sitemap"], default="full",
+                            help="walk every category page or read the stand-in sitemap")
+    arg_parser.add_argument("--output", default=BENCHMARK_RESULTS_FILENAME, help="JSONL file results are appended to")
+    args = arg_parser.parse_args()
+
+    site = StandInSite(args.categories, args.pages, args.per_page, args.unique_games, args.latency_ms, args.error_rate,
+                       args.capacity)
+    server = multiprocessing.Process(target=site.serve, daemon=True)
+    server.start()
+    output = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="scraper-bench-")
+    try:
+        # The scraper keeps its state files in the working directory.
+        os.chdir(workdir)
+        time.sleep(1)
+        metrics = asyncio.run(run_scraper(site, args.discovery))
+    finally:
+        server.terminate()
+
+    result = {
+        "date": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "metrics": metrics
+    }
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result) + "\n")
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
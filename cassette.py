@@ -0,0 +1,130 @@
+import gzip
+import hashlib
+import json
+import os
+from files import atomic_write
+
+CASSETTE_DIRNAME = "cassette"
+INDEX_FILENAME = "index.jsonl"
+RECORDED_HEADERS = ("ETag", "Last-Modified", "Content-Type")
+FLUSH_BATCH_SIZE = 100
+
+
+class Cassette:
+    # Record/replay store for HTTP traffic. Bodies are gzipped under
+    # objects/<sha256>, so a page fetched on many runs or from many URLs is
+    # stored once; index.jsonl maps each URL to its status, a few headers and
+    # its body hash, and each validated link to its verdict. Later lines win.
+    # While replaying, fetch_response and validate_single_link answer from the
+    # store and never touch the network.
+    def __init__(self):
+        self.mode = None
+        self.directory = None
+        self.responses = {}
+        self.verdicts = {}
+        self.pending = []
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def record_to(self, directory=CASSETTE_DIRNAME):
+        self._open(directory, "record")
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        return self
+
+    def replay_from(self, directory=CASSETTE_DIRNAME):
+        if not os.path.exists(os.path.join(directory, INDEX_FILENAME)):
+            raise FileNotFoundError(f"No cassette recorded in {directory}")
+        return self._open(directory, "replay")
+
+    def _open(self, directory, mode):
+        self.mode = mode
+        self.directory = directory
+        try:
+            with open(os.path.join(directory, INDEX_FILENAME), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if "url" in entry:
+                        self.responses[entry["url"]] = entry
+                    else:
+                        self.verdicts[entry["link"]] = entry["verdict"]
+        except FileNotFoundError:
+            pass
+        return self
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:] + ".gz")
+
+    def record(self, url, status, headers, content):
+        digest = None
+        if content is not None:
+            body = content.encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write(path, gzip.compress(body, mtime=0))
+        headers = {name: headers[name] for name in RECORDED_HEADERS if headers and name in headers}
+        self._append({"url": url, "status": status, "headers": headers, "sha256": digest})
+        self.responses[url] = self.pending[-1]
+
+    def record_verdict(self, link, result):
+        self.verdicts[link] = list(result)
+        self._append({"link": link, "verdict": list(result)})
+
+    def _append(self, entry):
+        self.recorded += 1
+        self.pending.append(entry)
+        if len(self.pending) >= FLUSH_BATCH_SIZE:
+            self.flush()
+
+    def response(self, url):
+        # (status, headers, content) as fetch_response returns them; a URL
+        # that was never recorded looks like a failed request.
+        entry = self.responses.get(url)
+        if entry is None:
+            self.misses += 1
+            return None, None, None
+        self.hits += 1
+        content = None
+        if entry["sha256"] is not None:
+            with open(self._object_path(entry["sha256"]), 'rb') as f:
+                content = gzip.decompress(f.read()).decode("utf-8")
+        return entry["status"], entry["headers"], content
+
+    def verdict(self, link):
+        verdict = self.verdicts.get(link)
+        if verdict is None:
+            self.misses += 1
+            return (None, None)
+        self.hits += 1
+        return tuple(verdict)
+
+    def flush(self):
+        if not self.pending:
+            return
+        with open(os.path.join(self.directory, INDEX_FILENAME), 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in self.pending)
+        self.pending = []
+
+    def close(self):
+        if self.recording:
+            self.flush()
+
+    def summary(self):
+        if self.recording:
+            return f"{self.recorded} responses and verdicts recorded to {self.directory}"
+        return f"{self.hits} replayed, {self.misses} missing from {self.directory}"
+
+
+cassette = Cassette()
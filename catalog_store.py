@@ -0,0 +1,182 @@
+import json
+import sqlite3
+import sys
+from urllib.parse import urlsplit
+from files import atomic_file
+from records import GameRecord
+from titles import normalize_title
+
+CATALOG_DB_FILENAME = "catalog.db"
+UPSERT_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL UNIQUE,
+    file_size TEXT,
+    upload_date TEXT
+);
+CREATE INDEX IF NOT EXISTS games_upload_date ON games (upload_date);
+CREATE TABLE IF NOT EXISTS links (
+    game_id INTEGER NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    uri TEXT NOT NULL,
+    host TEXT NOT NULL,
+    PRIMARY KEY (game_id, position)
+);
+CREATE INDEX IF NOT EXISTS links_host ON links (host);
+"""
+
+
+def link_host(uri):
+    host = (urlsplit(uri).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def indented_entry(entry):
+    # An entry laid out the way json.dump(data, indent=4) nests it in "downloads".
+    return "\n".join("        " + line for line in json.dumps(entry, ensure_ascii=False, indent=4).split("\n"))
+
+
+class CatalogStore:
+    # SQLite-backed catalog, one row per normalized title with its links in a
+    # side table. Upserts run in batched transactions and export_json streams
+    # the rows into the Hydra {"name", "downloads"} document row by row.
+    def __init__(self, filename=CATALOG_DB_FILENAME):
+        self.filename = filename
+        self.conn = None
+
+    def open(self):
+        self.conn = sqlite3.connect(self.filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def upsert(self, entries, newer_only=False):
+        # With newer_only an existing row is only replaced by an entry with a
+        # later uploadDate, which is how imports from several sources merge.
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= UPSERT_BATCH_SIZE:
+                self._upsert_batch(batch, newer_only)
+                batch = []
+        if batch:
+            self._upsert_batch(batch, newer_only)
+
+    def _upsert_batch(self, entries, newer_only):
+        condition = "WHERE COALESCE(excluded.upload_date, '') > COALESCE(games.upload_date, '')" if newer_only else ""
+        with self.conn:
+            for entry in entries:
+                key = normalize_title(entry["title"])
+                cursor = self.conn.execute(f"""
+                    INSERT INTO games (title, title_key, file_size, upload_date) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (title_key) DO UPDATE SET
+                        title = excluded.title,
+                        file_size = excluded.file_size,
+                        upload_date = excluded.upload_date
+                    {condition}
+                """, (entry["title"], key, entry.get("fileSize"), entry.get("uploadDate")))
+                if not cursor.rowcount:
+                    continue
+                game_id = self.conn.execute("SELECT id FROM games WHERE title_key = ?", (key,)).fetchone()[0]
+                self.conn.execute("DELETE FROM links WHERE game_id = ?", (game_id,))
+                self.conn.executemany(
+                    "INSERT INTO links (game_id, position, uri, host) VALUES (?, ?, ?, ?)",
+                    [(game_id, position, uri, link_host(uri)) for position, uri in enumerate(entry.get("uris", []))]
+                )
+
+    def sync(self, entries):
+        # Make the store hold exactly these entries: upsert them and drop rows
+        # whose title is no longer in the catalog.
+        entries = list(entries)
+        self.upsert(entries)
+        keys = {normalize_title(entry["title"]) for entry in entries}
+        stale = [(game_id,) for game_id, key in self.conn.execute("SELECT id, title_key FROM games") if key not in keys]
+        with self.conn:
+            self.conn.executemany("DELETE FROM games WHERE id = ?", stale)
+
+    def apply(self, entries, removed_keys):
+        # Partial update: upsert the changed entries and delete the rows of
+        # titles that left the catalog; every other row is left alone.
+        self.upsert(entries)
+        with self.conn:
+            self.conn.executemany("DELETE FROM games WHERE title_key = ?", [(key,) for key in removed_keys])
+
+    def entries(self, sort_by_title=False):
+        # Yields catalog entries in insertion order, or by normalized title for
+        # output that keeps its order between runs, without loading all rows.
+        # One query: each game's rows arrive together with its links in order.
+        order = "games.title_key" if sort_by_title else "games.id"
+        rows = self.conn.execute(
+            "SELECT games.id, games.title, games.file_size, games.upload_date, links.uri FROM games "
+            f"LEFT JOIN links ON links.game_id = games.id ORDER BY {order}, links.position")
+        entry = None
+        last_id = None
+        for game_id, title, file_size, upload_date, uri in rows:
+            if game_id != last_id:
+                if entry is not None:
+                    yield entry
+                entry = {"title": title, "uris": [], "fileSize": file_size, "uploadDate": upload_date}
+                last_id = game_id
+            if uri is not None:
+                entry["uris"].append(uri)
+        if entry is not None:
+            yield entry
+
+    def import_json(self, json_filename):
+        # Entries are stored the way GameRecord exports them ("8192 MB" as
+        # "8 GB", dates to the second), so later saves of unchanged games
+        # write the same values back and the published delta stays empty.
+        try:
+            with open(json_filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        downloads = data.get("downloads", [])
+        self.upsert((GameRecord.from_entry(entry).to_entry() for entry in downloads), newer_only=True)
+        return len(downloads)
+
+    def export_json(self, json_filename, name, sort_by_title=False):
+        # Same bytes as json.dump(data, indent=4), written one entry at a time.
+        with atomic_file(json_filename) as f:
+            f.write('{\n    "name": ' + json.dumps(name, ensure_ascii=False) + ',\n    "downloads": [')
+            first = True
+            for entry in self.entries(sort_by_title):
+                f.write(("\n" if first else ",\n") + indented_entry(entry))
+                first = False
+            f.write("]\n}" if first else "\n    ]\n}")
+
+
+def main(argv):
+    # python catalog_store.py import hydra_sources.json steamgg.json
+    # python catalog_store.py export shisuyssource.json "Shisuy's source"
+    store = CatalogStore().open()
+    try:
+        if len(argv) >= 2 and argv[0] == "import":
+            for json_filename in argv[1:]:
+                print(f"Imported {store.import_json(json_filename)} entries from {json_filename}")
+            print(f"Catalog now holds {len(store)} games")
+        elif len(argv) in (2, 3) and argv[0] == "export":
+            store.export_json(argv[1], argv[2] if len(argv) == 3 else "Hydra Source")
+            print(f"Exported {len(store)} games to {argv[1]}")
+        else:
+            print("Usage: catalog_store.py import FILE... | export FILE [NAME]")
+            return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,64 @@
+import json
+import os
+from datetime import datetime
+from files import atomic_write
+
+CHECKPOINT_FILENAME = "crawl_checkpoint.json"
+CHECKPOINT_INTERVAL_SECONDS = 60
+
+
+class CrawlCheckpoint:
+    # Progress of an in-flight crawl: listing pages already handled per
+    # category, detail URLs claimed but not merged yet, the frontier's seen set,
+    # the merged catalog, the validation verdict of each catalog entry and the
+    # title keys the crawl merged a new or newer game into. Saved atomically so an interrupted run can be resumed with --resume.
+    def __init__(self, filename=CHECKPOINT_FILENAME):
+        self.filename = filename
+        self.pages_done = {}
+        self.pending_details = {}
+        self.seen = []
+        self.entries = None
+        self.verdicts = []
+        self.processed = 0
+        self.crawled = set()
+
+    def load(self):
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        self.pages_done = {base_url: set(pages) for base_url, pages in data.get("pages_done", {}).items()}
+        self.pending_details = data.get("pending_details", {})
+        self.seen = data.get("seen", [])
+        self.entries = data.get("entries")
+        self.verdicts = data.get("verdicts", [])
+        self.processed = data.get("processed", 0)
+        self.crawled = set(data.get("crawled", []))
+        return self
+
+    def save(self, catalog, frontier, verdicts, processed):
+        entries = catalog.entries()
+        data = {
+            "updated": datetime.now().isoformat(),
+            "pages_done": {base_url: sorted(pages) for base_url, pages in self.pages_done.items()},
+            "pending_details": self.pending_details,
+            "seen": sorted(frontier.seen),
+            "entries": [entry.to_entry() for entry in entries],
+            "verdicts": [verdicts.get(id(entry)) for entry in entries],
+            "processed": processed,
+            "crawled": sorted(self.crawled)
+        }
+        atomic_write(self.filename, json.dumps(data, ensure_ascii=False))
+
+    def clear(self):
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+
+    def is_page_done(self, base_url, page_num):
+        return page_num in self.pages_done.get(base_url, ())
+
+    def page_done(self, base_url, page_num):
+        self.pages_done.setdefault(base_url, set()).add(page_num)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from files import atomic_write
+from records import parse_timestamp
+
+SITE_URL = "https://repack-games.com"
+SITEMAP_URLS = [SITE_URL + "/sitemap_index.xml", SITE_URL + "/wp-sitemap.xml"]
+FEED_URLS = [SITE_URL + "/feed/"]
+DISCOVERY_STATE_FILENAME = "discovery_state.json"
+FULL_CRAWL_INTERVAL_DAYS = 7
+# Margin for clock skew and posts published while the last run was going.
+SINCE_OVERLAP_SECONDS = 6 * 3600
+MAX_SITEMAP_DEPTH = 2
+# Taxonomy, author and page sitemaps never list game posts.
+SKIPPED_SITEMAP = re.compile(r"(category|tag|author|page)-sitemap|sitemap-(taxonomies|users)", re.IGNORECASE)
+NON_POST_PATH = re.compile(r"/(category|tag|author|page|feed)/", re.IGNORECASE)
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element, name):
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or "").strip() or None
+    return None
+
+
+def extract_sitemap(page_content):
+    # Returns (child sitemaps, post URLs), each as [loc, lastmod] pairs, for a
+    # sitemap index or a urlset.
+    try:
+        root = ET.fromstring(page_content.encode("utf-8"))
+    except ET.ParseError:
+        return [], []
+    sitemaps, urls = [], []
+    for element in root:
+        name = _local_name(element.tag)
+        loc = _child_text(element, "loc")
+        if not loc:
+            continue
+        if name == "sitemap":
+            sitemaps.append([loc, _child_text(element, "lastmod")])
+        elif name == "url":
+            urls.append([loc, _child_text(element, "lastmod")])
+    return sitemaps, urls
+
+
+def extract_feed(page_content):
+    # RSS <item> and Atom <entry> links with their ISO publication date.
+    try:
+        root = ET.fromstring(page_content.encode("utf-8"))
+    except ET.ParseError:
+        return []
+    posts = []
+    for element in root.iter():
+        name = _local_name(element.tag)
+        if name == "item":
+            date = _child_text(element, "pubDate")
+            try:
+                date = parsedate_to_datetime(date).isoformat() if date else None
+            except (TypeError, ValueError):
+                date = None
+            link = _child_text(element, "link")
+        elif name == "entry":
+            date = _child_text(element, "updated") or _child_text(element, "published")
+            link = next((child.get("href") for child in element
+                         if _local_name(child.tag) == "link" and child.get("href")), None)
+        else:
+            continue
+        if link:
+            posts.append([link, date])
+    return posts
+
+
+def is_post_url(url):
+    return url.startswith(SITE_URL) and url.rstrip("/") != SITE_URL and not NON_POST_PATH.search(url)
+
+
+class DiscoveryState:
+    # When the last successful run and the last full pagination finished, so
+    # a run can ask the sitemaps for posts changed since then and still walk
+    # every category once every FULL_CRAWL_INTERVAL_DAYS to reconcile.
+    def __init__(self, filename=DISCOVERY_STATE_FILENAME, full_crawl_interval_days=FULL_CRAWL_INTERVAL_DAYS):
+        self.filename = filename
+        self.full_crawl_interval = full_crawl_interval_days * 86400
+        self.last_success = None
+        self.last_full_crawl = None
+
+    def load(self):
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        self.last_success = parse_timestamp(data.get("last_success"))
+        self.last_full_crawl = parse_timestamp(data.get("last_full_crawl"))
+        return self
+
+    def save(self):
+        data = {
+            "last_success": datetime.fromtimestamp(self.last_success).isoformat() if self.last_success else None,
+            "last_full_crawl": datetime.fromtimestamp(self.last_full_crawl).isoformat() if self.last_full_crawl else None
+        }
+        atomic_write(self.filename, json.dumps(data, ensure_ascii=False, indent=4))
+
+    def full_crawl_due(self, now=None):
+        now = time.time() if now is None else now
+        return (self.last_success is None or self.last_full_crawl is None
+                or now - self.last_full_crawl >= self.full_crawl_interval)
+
+    def since(self):
+        return self.last_success - SINCE_OVERLAP_SECONDS
+
+    def finish(self, started, full_crawl):
+        # `started` rather than the end time, so posts changed during the run
+        # are picked up by the next one.
+        self.last_success = int(started)
+        if full_crawl:
+            self.last_full_crawl = int(started)
+
+
+async def fetch_changed_posts(engine, since, validators=None, sitemap_urls=None, feed_urls=None):
+    # Post URLs whose sitemap <lastmod> or feed date is after `since`, newest
+    # first. Returns None when the sources cannot vouch for every post changed
+    # since then, in which case the caller has to fall back to paginating the
+    # categories: no post sitemap was dated (or one listed posts without
+    # dates), and no feed reached back to `since`. A dated sitemap index only
+    # vouches for the child sitemaps it skips as unchanged.
+    sitemap_urls = SITEMAP_URLS if sitemap_urls is None else sitemap_urls
+    feed_urls = FEED_URLS if feed_urls is None else feed_urls
+    changed = {}
+    dated_sources = 0
+    undated_sources = 0
+
+    def consider(entries):
+        # Returns the dates found, oldest first.
+        timestamps = []
+        for url, date in entries:
+            timestamp = parse_timestamp(date)
+            if timestamp is None:
+                continue
+            timestamps.append(timestamp)
+            if timestamp >= since and is_post_url(url):
+                changed[url] = max(timestamp, changed.get(url, timestamp))
+        return sorted(timestamps)
+
+    async def read_sitemap(url, depth):
+        nonlocal dated_sources, undated_sources
+        extracted = await engine.fetch_extracted(url, extract_sitemap, validators)
+        if not extracted:
+            return
+        sitemaps, urls = extracted
+        if any(is_post_url(loc) for loc, lastmod in urls):
+            if consider(urls):
+                dated_sources += 1
+            else:
+                undated_sources += 1
+        if depth >= MAX_SITEMAP_DEPTH:
+            return
+        children = [loc for loc, lastmod in sitemaps if not SKIPPED_SITEMAP.search(loc)]
+        unchanged = [loc for loc, lastmod in sitemaps
+                     if loc in children and parse_timestamp(lastmod) is not None and parse_timestamp(lastmod) < since]
+        dated_sources += len(unchanged)
+        await asyncio.gather(*(read_sitemap(loc, depth + 1) for loc in children if loc not in unchanged))
+
+    async def read_feed(url):
+        nonlocal dated_sources
+        timestamps = consider(await engine.fetch_extracted(url, extract_feed, validators) or [])
+        # A feed only holds the latest items; it covers the gap only if its
+        # oldest item is from before `since`.
+        if timestamps and timestamps[0] < since:
+            dated_sources += 1
+
+    await asyncio.gather(*(read_sitemap(url, 1) for url in sitemap_urls), *(read_feed(url) for url in feed_urls))
+    if not dated_sources or undated_sources:
+        return None
+    return sorted(changed, key=changed.get, reverse=True)
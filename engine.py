@@ -0,0 +1,170 @@
+import aiohttp
+import asyncio
+import json
+from cassette import cassette
+from files import atomic_write
+from hosts import HOST_LIMITS, MAX_RETRIES, RETRY_STATUSES, HostLimiter, RetryableResponse, host_key, retry_delay
+from http_cache import hash_body
+from logs import log
+from metrics import metrics
+from parsing import ParseExecutor
+from streaming import PAGE_BYTE_CAP, read_text
+
+CONCURRENT_REQUESTS = 100
+REQUEST_TIMEOUT_SECONDS = 30
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+
+parser = ParseExecutor()
+
+
+def make_connector(limit=CONCURRENT_REQUESTS):
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=max(concurrency for concurrency, _ in HOST_LIMITS.values()),
+        ttl_dns_cache=300,
+        keepalive_timeout=30
+    )
+
+
+async def read_page(response, max_bytes=PAGE_BYTE_CAP):
+    page_content, _ = await read_text(response, max_bytes)
+    return page_content
+
+
+async def read_json(response):
+    return await response.json(content_type=None)
+
+
+async def request(session, url, limiter, headers=HEADERS, read=read_page):
+    # GET url inside a limiter slot, retrying throttled responses and network
+    # errors with backoff. Returns (status, headers, body) where body is
+    # read(response) for a 200 and None otherwise; a status still throttled
+    # after the last attempt is returned, a network error on it is raised.
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+    host = host_key(url)
+    for attempt in range(MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            async with limiter.slot(url):
+                start = metrics.start()
+                async with session.get(url, headers=headers, timeout=timeout) as response:
+                    metrics.inc("responses", host=host, status=response.status)
+                    metrics.stop("fetch_seconds", start, host=host)
+                    if response.status == 200:
+                        return response.status, response.headers, await read(response)
+                    if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        return response.status, response.headers, None
+                    # Raised inside the slot so the limiter counts it as a failure.
+                    raise RetryableResponse(response.status, response.headers.get("Retry-After"))
+        except RetryableResponse as e:
+            retry_after = e.retry_after
+        except Exception:
+            metrics.inc("fetch_errors", host=host)
+            if attempt == MAX_RETRIES:
+                raise
+        await asyncio.sleep(retry_delay(attempt, retry_after))
+
+
+async def fetch_response(session, url, limiter, headers=HEADERS, max_bytes=PAGE_BYTE_CAP):
+    if cassette.replaying:
+        return cassette.response(url)
+    try:
+        status, response_headers, page_content = await request(
+            session, url, limiter, headers, lambda response: read_page(response, max_bytes))
+    except Exception as e:
+        log.error(f"Error fetching {url}: {str(e)}", "fetch_error", url=url)
+        return None, None, None
+    if cassette.recording:
+        cassette.record(url, status, response_headers, page_content)
+    return status, response_headers, page_content
+
+
+async def fetch_page(session, url, limiter, headers=HEADERS):
+    _, _, page_content = await fetch_response(session, url, limiter, headers)
+    return page_content
+
+
+async def fetch_extracted(session, url, limiter, validators, extract, headers=HEADERS):
+    # Fetch a page and run extract() on it, reusing the stored extraction when
+    # the server answers 304 or the body hash is unchanged since the last run.
+    if validators is None:
+        page_content = await fetch_page(session, url, limiter, headers)
+        return await parser.run(extract, page_content) if page_content else None
+
+    conditional_headers = validators.request_headers(url, headers)
+    status, response_headers, page_content = await fetch_response(session, url, limiter, conditional_headers)
+    if status == 304:
+        return validators.reuse(url, response_headers)
+    if not page_content:
+        return None
+
+    body_hash = hash_body(page_content)
+    extracted = validators.reuse(url, response_headers, body_hash)
+    if extracted is not None:
+        return extracted
+
+    extracted = await parser.run(extract, page_content)
+    validators.record(url, response_headers, body_hash, extracted)
+    return extracted
+
+
+def write_source(json_filename, name, downloads, **fields):
+    # Extra fields are for internal files such as shard partials, not Hydra.
+    atomic_write(json_filename, json.dumps({"name": name, "downloads": downloads, **fields}, ensure_ascii=False,
+                                           indent=4))
+
+
+class SiteAdapter:
+    # A scraped site: what to crawl and how to turn its pages into Hydra
+    # entries. Fetching, limits, retries and parsing come from the engine.
+    name = None
+
+    async def run(self, engine):
+        raise NotImplementedError
+
+
+class Engine:
+    # Runtime shared by every site adapter: one aiohttp session and connection
+    # pool, the per-host limiter and the parse executor. run() drives several
+    # adapters concurrently so they share the pool and the run-wide cap.
+    def __init__(self, concurrency=CONCURRENT_REQUESTS):
+        self.concurrency = concurrency
+        self.session = None
+        self.limiter = None
+
+    async def __aenter__(self):
+        self.limiter = HostLimiter(total=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=make_connector(self.concurrency))
+        parser.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        parser.close()
+        if self.limiter.total.requests:
+            log.info(f"Concurrency limit: {self.limiter.total.summary()}")
+
+    async def request(self, url, headers=HEADERS, read=read_page):
+        return await request(self.session, url, self.limiter, headers, read)
+
+    async def fetch_page(self, url, headers=HEADERS):
+        return await fetch_page(self.session, url, self.limiter, headers)
+
+    async def fetch_extracted(self, url, extract, validators=None, headers=HEADERS):
+        return await fetch_extracted(self.session, url, self.limiter, validators, extract, headers)
+
+    async def parse(self, extract, *args):
+        return await parser.run(extract, *args)
+
+    async def run(self, *adapters):
+        results = await asyncio.gather(*(adapter.run(self) for adapter in adapters), return_exceptions=True)
+        for adapter, result in zip(adapters, results):
+            if isinstance(result, Exception):
+                log.error(f"Error in {adapter.name}: {str(result)}", adapter=adapter.name)
+        return results
@@ -0,0 +1,18 @@
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_file(filename, mode='w'):
+    # Writes go to filename + ".tmp", which replaces filename only once the
+    # block finishes, so an interrupted run never leaves a truncated file.
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, mode, **({} if 'b' in mode else {"encoding": "utf-8"})) as f:
+        yield f
+    os.replace(tmp_filename, filename)
+
+
+def atomic_write(filename, data):
+    # data is text (written as UTF-8) or bytes.
+    with atomic_file(filename, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
@@ -0,0 +1,43 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Exact names, except utm_* which is a whole family of parameters; a prefix
+# match on "ref" would also drop real ones such as refresh=.
+TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+
+def is_tracking_param(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonicalize_url(url):
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(key)
+    ))
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, query, ""))
+
+
+class CrawlFrontier:
+    # Run-wide record of detail pages already scheduled, keyed by canonical URL,
+    # so a game listed under several categories is fetched and parsed once.
+    def __init__(self):
+        self.seen = set()
+        self.duplicates = 0
+
+    def claim(self, url):
+        key = canonicalize_url(url)
+        if key in self.seen:
+            self.duplicates += 1
+            return False
+        self.seen.add(key)
+        return True
+
+    def claim_all(self, urls):
+        return [url for url in urls if self.claim(url)]
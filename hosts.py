@@ -0,0 +1,226 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from logs import log
+from metrics import metrics
+
+# Per-host (max concurrent requests, requests per second). The scraped site
+# throttles aggressively; the file hosts tolerate more parallel checks.
+HOST_LIMITS = {
+    "repack-games.com": (8, 4),
+    "pixeldrain.com": (20, 10),
+    "qiwi.gg": (20, 10),
+    "1fichier.com": (10, 5),
+    "steamgg.net": (10, 5),
+    "datanodes.to": (10, 5),
+}
+DEFAULT_HOST_LIMIT = (10, 5)
+TOTAL_CONCURRENCY = 100
+# The run-wide cap starts here and moves between the bounds by AIMD: +1 per
+# window of healthy, saturated traffic, x0.7 when the window's p95 latency
+# exceeds twice the baseline p95 or more than 5% of requests failed.
+INITIAL_CONCURRENCY = 16
+MIN_CONCURRENCY = 4
+MIN_WINDOW_SAMPLES = 50
+LATENCY_TOLERANCE = 2.0
+# Jitter below this is scheduling noise on fast hosts, not queueing.
+LATENCY_NOISE_SECONDS = 0.05
+MAX_ERROR_RATE = 0.05
+DECREASE_FACTOR = 0.7
+# The baseline p95 follows lower windows by this fraction, so one lucky
+# window does not set it. It only rises, by BASELINE_DRIFT per window, once
+# the limit is at its minimum, so a server that got slower for good does not
+# hold it there, while slowly building queues cannot drag it along.
+BASELINE_SMOOTHING = 0.2
+BASELINE_DRIFT = 0.05
+
+RETRY_STATUSES = (429, 503)
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 60
+
+
+def host_key(url):
+    host = (urlsplit(url).hostname or "").lower()
+    for known in HOST_LIMITS:
+        if host == known or host.endswith("." + known):
+            return known
+    return host
+
+
+def retry_delay(attempt, retry_after=None):
+    # Honor Retry-After (seconds or HTTP date) when the server sent one,
+    # otherwise back off exponentially with full jitter.
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                return min(max(delay, 0), BACKOFF_MAX_SECONDS)
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class RetryableResponse(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"Status {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveLimit:
+    # Run-wide concurrency cap that finds its own value. Every released slot
+    # reports how long it was held and whether the request failed (an
+    # exception inside the slot: timeouts, connection errors, 429/503). Each
+    # window of max(MIN_WINDOW_SAMPLES, limit) requests moves the limit: down
+    # by DECREASE_FACTOR when its p95 latency or error rate is unhealthy, up
+    # by one when it was healthy and the limit was actually reached.
+    def __init__(self, initial=INITIAL_CONCURRENCY, maximum=TOTAL_CONCURRENCY, minimum=MIN_CONCURRENCY):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.limit = float(max(self.minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self.requests = 0
+        self.baseline = None
+        self.peak = int(self.limit)
+        self.decreases = 0
+        self.started = time.monotonic()
+        self.history = [(0.0, int(self.limit))]
+        metrics.gauge("concurrency_limit", int(self.limit))
+        self._waiters = deque()
+        self._latencies = []
+        self._failures = 0
+        self._saturated = False
+
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # Pass on the wake-up this task will not use.
+                    self._wake()
+                raise
+        self.in_flight += 1
+        if self.in_flight >= int(self.limit):
+            self._saturated = True
+        return time.monotonic()
+
+    def release(self, start, failed=False):
+        self.in_flight -= 1
+        self.requests += 1
+        self._observe(time.monotonic() - start, failed)
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _observe(self, latency, failed):
+        self._latencies.append(latency)
+        self._failures += failed
+        if len(self._latencies) < max(MIN_WINDOW_SAMPLES, int(self.limit)):
+            return
+        latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        error_rate = self._failures / len(latencies)
+        saturated = self._saturated
+        self._latencies, self._failures, self._saturated = [], 0, False
+
+        if self.baseline is None:
+            self.baseline = p95
+        elif p95 < self.baseline:
+            self.baseline += (p95 - self.baseline) * BASELINE_SMOOTHING
+        elif self.limit <= self.minimum:
+            self.baseline *= 1 + BASELINE_DRIFT
+        previous = int(self.limit)
+        slow = p95 > max(self.baseline * LATENCY_TOLERANCE, self.baseline + LATENCY_NOISE_SECONDS)
+        if error_rate > MAX_ERROR_RATE or slow:
+            self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+            if int(self.limit) < previous:
+                self.decreases += 1
+                log.info(f"Concurrency limit {previous} -> {int(self.limit)} (p95 {p95 * 1000:.0f} ms, "
+                         f"{error_rate:.0%} failed)", "concurrency_decrease", limit=int(self.limit),
+                         p95_ms=round(p95 * 1000, 1), error_rate=round(error_rate, 3))
+        elif saturated:
+            self.limit = min(self.maximum, self.limit + 1)
+        if int(self.limit) != previous:
+            self.peak = max(self.peak, int(self.limit))
+            self.history.append((round(time.monotonic() - self.started, 3), int(self.limit)))
+            metrics.gauge("concurrency_limit", int(self.limit))
+            log.debug(f"Concurrency limit {previous} -> {int(self.limit)}", limit=int(self.limit))
+
+    def summary(self):
+        return (f"settled at {int(self.limit)} after {self.requests} requests (peak {self.peak}, "
+                f"{self.decreases} decreases, bounds {self.minimum}-{self.maximum})")
+
+
+class HostLimiter:
+    # Replaces the single global semaphore: every request takes a slot from
+    # its host's semaphore and token bucket, plus one from the run-wide
+    # AdaptiveLimit, which learns how many requests may be in flight at once.
+    def __init__(self, limits=HOST_LIMITS, default=DEFAULT_HOST_LIMIT, total=TOTAL_CONCURRENCY,
+                 initial=INITIAL_CONCURRENCY):
+        self.limits = limits
+        self.default = default
+        self.total = AdaptiveLimit(initial, total)
+        self.hosts = {}
+
+    def _host(self, key):
+        if key not in self.hosts:
+            concurrency, rate = self.limits.get(key, self.default)
+            self.hosts[key] = (asyncio.Semaphore(concurrency), TokenBucket(rate))
+        return self.hosts[key]
+
+    @asynccontextmanager
+    async def slot(self, url):
+        key = host_key(url)
+        semaphore, bucket = self._host(key)
+        start = metrics.start()
+        async with semaphore:
+            await bucket.acquire()
+            held = await self.total.acquire()
+            metrics.stop("slot_wait_seconds", start, host=key)
+            failed = False
+            try:
+                yield
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self.total.release(held, failed)
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from files import atomic_write
+
+HTTP_CACHE_FILENAME = "http_cache.json"
+HTTP_CACHE_MAX_AGE_DAYS = 30
+
+
+def hash_body(page_content):
+    return hashlib.sha1(page_content.encode("utf-8")).hexdigest()
+
+
+class ValidatorStore:
+    # Persistent per-URL HTTP validators (ETag, Last-Modified, body hash) along
+    # with whatever was extracted from the page the last time it was parsed.
+    # A 304 or an identical body hash lets the caller reuse that extraction.
+    def __init__(self, filename=HTTP_CACHE_FILENAME, max_age_days=HTTP_CACHE_MAX_AGE_DAYS):
+        self.filename = filename
+        self.max_age = timedelta(days=max_age_days)
+        self.entries = {}
+        self.not_modified = 0
+        self.unchanged = 0
+        self.parsed = 0
+
+    def load(self):
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("entries", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        cutoff = (datetime.now() - self.max_age).isoformat()
+        entries = {url: entry for url, entry in self.entries.items() if entry.get("checked", "") >= cutoff}
+        atomic_write(self.filename, json.dumps({"updated": datetime.now().isoformat(), "entries": entries},
+                                               ensure_ascii=False))
+
+    def request_headers(self, url, headers):
+        entry = self.entries.get(url)
+        if not entry:
+            return headers
+        conditional = dict(headers)
+        if entry.get("etag"):
+            conditional["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            conditional["If-Modified-Since"] = entry["last_modified"]
+        return conditional
+
+    def reuse(self, url, response_headers=None, body_hash=None):
+        entry = self.entries.get(url)
+        if not entry:
+            return None
+        if body_hash is not None and entry.get("hash") != body_hash:
+            return None
+        if response_headers is not None:
+            self._store_validators(entry, response_headers)
+        entry["checked"] = datetime.now().isoformat()
+        if body_hash is None:
+            self.not_modified += 1
+        else:
+            self.unchanged += 1
+        return entry["extracted"]
+
+    def record(self, url, response_headers, body_hash, extracted):
+        entry = {"hash": body_hash, "extracted": extracted, "checked": datetime.now().isoformat()}
+        self._store_validators(entry, response_headers)
+        self.entries[url] = entry
+        self.parsed += 1
+
+    def _store_validators(self, entry, response_headers):
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+
+    def summary(self):
+        return f"{self.not_modified} not modified, {self.unchanged} unchanged, {self.parsed} parsed"
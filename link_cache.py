@@ -0,0 +1,65 @@
+import json
+import random
+from datetime import datetime, timedelta
+from files import atomic_write
+
+LINK_CACHE_FILENAME = "link_cache.json"
+POSITIVE_TTL_HOURS = 72
+NEGATIVE_TTL_HOURS = 12
+REVALIDATE_FRACTION = 0.05
+
+
+class LinkCache:
+    # Persistent per-link validation results (valid flag, detected size and when
+    # it was checked). Valid and invalid results expire on separate TTLs, and a
+    # random fraction of unexpired valid links is rechecked every run so stale
+    # positives are caught without revalidating the whole catalog.
+    def __init__(self, filename=LINK_CACHE_FILENAME, positive_ttl_hours=POSITIVE_TTL_HOURS,
+                 negative_ttl_hours=NEGATIVE_TTL_HOURS, revalidate_fraction=REVALIDATE_FRACTION):
+        self.filename = filename
+        self.positive_ttl = timedelta(hours=positive_ttl_hours)
+        self.negative_ttl = timedelta(hours=negative_ttl_hours)
+        self.revalidate_fraction = revalidate_fraction
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.sampled = 0
+
+    def load(self):
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("entries", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        now = datetime.now()
+        entries = {link: entry for link, entry in self.entries.items() if not self._expired(entry, now)}
+        atomic_write(self.filename, json.dumps({"updated": now.isoformat(), "entries": entries}, ensure_ascii=False))
+
+    def _expired(self, entry, now):
+        ttl = self.positive_ttl if entry["valid"] else self.negative_ttl
+        return entry["checked"] < (now - ttl).isoformat()
+
+    def lookup(self, link):
+        # Returns the cached (link, size) result, or None when the link has to
+        # be checked over the network.
+        entry = self.entries.get(link)
+        if not entry or self._expired(entry, datetime.now()):
+            self.misses += 1
+            return None
+        if entry["valid"] and random.random() < self.revalidate_fraction:
+            self.sampled += 1
+            return None
+        self.hits += 1
+        if entry["valid"]:
+            return link, entry.get("size")
+        return None, None
+
+    def record(self, link, result):
+        valid_link, size = result
+        self.entries[link] = {"valid": bool(valid_link), "size": size, "checked": datetime.now().isoformat()}
+
+    def summary(self):
+        return f"{self.hits} cached, {self.misses} checked, {self.sampled} rechecked by sampling"
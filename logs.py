@@ -0,0 +1,126 @@
+import json
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from colorama import Style
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {value: name.upper() for name, value in LEVELS.items()}
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_SECONDS = 0.5
+PROGRESS_INTERVAL_SECONDS = 30
+
+
+class BatchedLog:
+    # Log records are queued by the caller and written by a background thread
+    # in batches, one console write and one file write per batch, so neither
+    # the event loop nor the stdout pipe sees a write per game or per link.
+    # Records tagged with an event are also counted; in quiet mode the console
+    # only shows warnings, errors and a periodic line with those counts.
+    def __init__(self):
+        self.level = INFO
+        self.quiet = False
+        self.counts = {}
+        self._file = None
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def configure(self, level="info", quiet=False, filename=None):
+        self.level = LEVELS[level]
+        self.quiet = quiet
+        if filename:
+            self._file = open(filename, 'a', encoding='utf-8')
+        return self
+
+    def debug(self, message, event=None, color="", **fields):
+        self.log(DEBUG, message, event, color, **fields)
+
+    def info(self, message, event=None, color="", **fields):
+        self.log(INFO, message, event, color, **fields)
+
+    def warning(self, message, event=None, color="", **fields):
+        self.log(WARNING, message, event, color, **fields)
+
+    def error(self, message, event=None, color="", **fields):
+        self.log(ERROR, message, event, color, **fields)
+
+    def log(self, level, message, event=None, color="", **fields):
+        if event is not None:
+            self.counts[event] = self.counts.get(event, 0) + 1
+        if level < self.level:
+            return
+        if self._thread is None:
+            self._start()
+        self._queue.put((time.time(), level, event, message, color, fields))
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _write_loop(self):
+        last_progress = time.monotonic()
+        running = True
+        while running:
+            batch = []
+            try:
+                record = self._queue.get(timeout=LOG_FLUSH_SECONDS)
+                while record is not None:
+                    batch.append(record)
+                    if len(batch) == LOG_BATCH_SIZE:
+                        break
+                    record = self._queue.get_nowait()
+                else:
+                    running = False
+            except queue.Empty:
+                pass
+            self._write(batch)
+            if self.quiet and time.monotonic() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+                self._write_console(self.progress() + "\n")
+                last_progress = time.monotonic()
+
+    def _write(self, batch):
+        console = []
+        lines = []
+        for created, level, event, message, color, fields in batch:
+            if not self.quiet or level >= WARNING:
+                console.append(f"{color}{message}{Style.RESET_ALL}\n" if color else message + "\n")
+            if self._file is not None:
+                record = {"time": datetime.fromtimestamp(created).isoformat(), "level": LEVEL_NAMES[level]}
+                if event is not None:
+                    record["event"] = event
+                lines.append(json.dumps({**record, "message": message, **fields}, ensure_ascii=False) + "\n")
+        if console:
+            self._write_console("".join(console))
+        if lines:
+            self._file.write("".join(lines))
+            self._file.flush()
+
+    def _write_console(self, text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def progress(self):
+        counts = ", ".join(f"{event}: {count}" for event, count in sorted(dict(self.counts).items()))
+        return f"[{datetime.now().strftime('%H:%M:%S')}] Progress - {counts or 'nothing yet'}"
+
+    def close(self):
+        # Drains the queue, prints the final counts in quiet mode and closes
+        # the log file. Safe to call more than once.
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self.quiet:
+            self._write_console(self.progress() + "\n")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+log = BatchedLog()
@@ -0,0 +1,152 @@
+import argparse
+import json
+import re
+import unicodedata
+import zlib
+from frontier import canonicalize_url
+from engine import write_source
+from titles import normalize_title
+
+NUM_PERM = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 3
+MATCH_THRESHOLD = 0.8
+MIN_FUZZY_LENGTH = 12
+ROMAN_NUMERALS = {"i", "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix", "x", "xi", "xii", "xiii"}
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed coefficients so MinHash signatures are identical across runs.
+PERMUTATIONS = [
+    (zlib.crc32(f"a{i}".encode()) * 2 + 1, zlib.crc32(f"b{i}".encode()))
+    for i in range(NUM_PERM)
+]
+
+
+def title_tokens(title):
+    # "Abnormal1999:Sector 49" and "Abnormal 1999: Sector 49" both become
+    # ["abnormal", "1999", "sector", "49"].
+    text = unicodedata.normalize("NFKD", normalize_title(title))
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    text = re.sub(r"(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])", " ", text)
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def shingles(key):
+    if len(key) <= SHINGLE_SIZE:
+        return {key}
+    return {key[i:i + SHINGLE_SIZE] for i in range(len(key) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingle_set]
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+class TitleIndex:
+    # Groups catalog entries that are the same game. Entries with the same
+    # canonical token key match directly; near-duplicates are found through
+    # MinHash LSH buckets over character shingles and confirmed by exact
+    # Jaccard similarity, so only candidates sharing a bucket are compared.
+    # Titles whose numbers differ ("Game 2" vs "Game III") never match, and
+    # keys shorter than MIN_FUZZY_LENGTH only match exactly.
+    def __init__(self, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.parent = []
+        self.keys = {}
+        self.shingles = []
+        self.numbers = []
+        self.buckets = {}
+
+    def _find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def _union(self, i, j):
+        root_i, root_j = self._find(i), self._find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    def add(self, title):
+        i = len(self.parent)
+        self.parent.append(i)
+        tokens = title_tokens(title)
+        key = " ".join(tokens)
+        self.numbers.append(frozenset(token for token in tokens if token.isdigit() or token in ROMAN_NUMERALS))
+        self.shingles.append(shingles(key.replace(" ", "")))
+
+        if key in self.keys:
+            self._union(i, self.keys[key])
+            return i
+        self.keys[key] = i
+        if len(key) < MIN_FUZZY_LENGTH:
+            return i
+
+        signature = minhash(self.shingles[i])
+        rows = NUM_PERM // LSH_BANDS
+        candidates = set()
+        for band in range(LSH_BANDS):
+            bucket = self.buckets.setdefault((band, tuple(signature[band * rows:(band + 1) * rows])), [])
+            candidates.update(bucket)
+            bucket.append(i)
+        for j in candidates:
+            if self.numbers[i] == self.numbers[j] and self._similarity(i, j) >= self.threshold:
+                self._union(i, j)
+        return i
+
+    def _similarity(self, i, j):
+        a, b = self.shingles[i], self.shingles[j]
+        return len(a & b) / len(a | b)
+
+    def groups(self):
+        groups = {}
+        for i in range(len(self.parent)):
+            groups.setdefault(self._find(i), []).append(i)
+        return list(groups.values())
+
+
+def merge_group(entries):
+    # Newest uploadDate supplies title, size and date; links are the union
+    # across every source, newest first, without canonical duplicates.
+    ordered = sorted(entries, key=lambda entry: entry.get("uploadDate") or "", reverse=True)
+    merged = dict(ordered[0])
+    seen = set()
+    uris = []
+    for entry in ordered:
+        for uri in entry.get("uris", []):
+            key = canonicalize_url(uri)
+            if key not in seen:
+                seen.add(key)
+                uris.append(uri)
+    merged["uris"] = uris
+    return merged
+
+
+def merge_sources(json_filenames, threshold=MATCH_THRESHOLD):
+    index = TitleIndex(threshold)
+    entries = []
+    for json_filename in json_filenames:
+        with open(json_filename, 'r', encoding='utf-8') as f:
+            for entry in json.load(f).get("downloads", []):
+                index.add(entry["title"])
+                entries.append(entry)
+    return [merge_group([entries[i] for i in group]) for group in index.groups()]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Fuse several Hydra source files into one catalog")
+    arg_parser.add_argument("output", help="merged Hydra source to write")
+    arg_parser.add_argument("sources", nargs="+", help="Hydra source files to merge")
+    arg_parser.add_argument("--name", default="Hydra Source", help="name of the merged source")
+    arg_parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD,
+                            help="shingle Jaccard similarity needed to treat two titles as one game")
+    args = arg_parser.parse_args()
+
+    downloads = merge_sources(args.sources, args.threshold)
+    write_source(args.output, args.name, downloads)
+    print(f"Merged {len(args.sources)} sources into {len(downloads)} games in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import bisect
+import json
+import time
+from datetime import datetime
+from files import atomic_write
+
+METRICS_FILENAME = "metrics.json"
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction):
+        # Upper bound of the bucket holding the requested quantile.
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class Metrics:
+    # Run-wide counters, gauges and latency histograms keyed by name and
+    # labels (stage, host, extractor...). Every method returns immediately
+    # while disabled, and start() hands out None so timed call sites skip
+    # reading the clock as well.
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def enable(self):
+        self.enabled = True
+        return self
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        # Keeps the last and the peak value, e.g. for queue depth.
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        _, peak = self.gauges.get(key, (value, value))
+        self.gauges[key] = (value, max(peak, value))
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def start(self):
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, name, start, **labels):
+        if start is not None:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self):
+        def entries(items, render):
+            return [{"name": name, "labels": dict(labels), **render(value)} for (name, labels), value in sorted(items)]
+
+        return {
+            "updated": datetime.now().isoformat(),
+            "counters": entries(self.counters.items(), lambda value: {"value": value}),
+            "gauges": entries(self.gauges.items(), lambda value: {"value": value[0], "peak": value[1]}),
+            "histograms": entries(self.histograms.items(), lambda histogram: histogram.summary())
+        }
+
+    def write_json(self, filename=METRICS_FILENAME):
+        atomic_write(filename, json.dumps(self.summary(), ensure_ascii=False, indent=4))
+
+    def write_prometheus(self, filename):
+        lines = []
+        for (name, labels), value in sorted(self.counters.items()):
+            lines.append(f"scraper_{name}_total{_labels(labels)} {value}")
+        for (name, labels), (value, peak) in sorted(self.gauges.items()):
+            lines.append(f"scraper_{name}{_labels(labels)} {value}")
+            lines.append(f"scraper_{name}_peak{_labels(labels)} {peak}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"scraper_{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"scraper_{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"scraper_{name}_sum{_labels(labels)} {histogram.sum}")
+            lines.append(f"scraper_{name}_count{_labels(labels)} {histogram.count}")
+        atomic_write(filename, "\n".join(lines) + "\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+metrics = Metrics()
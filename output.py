@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import json
+import os
+from contextlib import ExitStack
+from datetime import datetime
+from catalog_store import indented_entry
+from files import atomic_file, atomic_write
+from titles import normalize_title
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def variant_filename(json_filename, variant):
+    # shisuyssource.json -> shisuyssource.min.json / shisuyssource.delta.json
+    stem, ext = os.path.splitext(json_filename)
+    return f"{stem}.{variant}{ext}"
+
+
+class PublishedFile:
+    # A published file and its gzip (and brotli, when installed) copies,
+    # written together chunk by chunk and each replaced atomically once the
+    # block finishes. sha256 hashes the uncompressed bytes.
+    def __init__(self, filename):
+        self.filename = filename
+        self.sha256 = hashlib.sha256()
+        self.stack = ExitStack()
+        self.brotli = None
+
+    def __enter__(self):
+        self.file = self.stack.enter_context(atomic_file(self.filename, 'wb'))
+        gzip_file = self.stack.enter_context(atomic_file(self.filename + ".gz", 'wb'))
+        # No name in the header and mtime=0 keep the gzip bytes identical when
+        # the content is.
+        self.gzip = self.stack.enter_context(gzip.GzipFile("", 'wb', GZIP_LEVEL, gzip_file, mtime=0))
+        if brotli is not None:
+            self.brotli_file = self.stack.enter_context(atomic_file(self.filename + ".br", 'wb'))
+            self.brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        return self
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.sha256.update(data)
+        self.file.write(data)
+        self.gzip.write(data)
+        if self.brotli is not None:
+            self.brotli_file.write(self.brotli.process(data))
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.brotli is not None:
+            self.brotli_file.write(self.brotli.finish())
+        return self.stack.__exit__(exc_type, exc, tb)
+
+
+def entry_fingerprint(entry):
+    # (title, digest): enough to tell whether an entry changed without
+    # keeping every published entry in memory.
+    digest = hashlib.sha256(json.dumps(entry, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+    return entry["title"], digest
+
+
+def read_published(json_filename):
+    try:
+        with open(json_filename, 'r', encoding='utf-8') as f:
+            downloads = json.load(f).get("downloads", [])
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return {normalize_title(entry["title"]): entry_fingerprint(entry) for entry in downloads}
+
+
+def catalog_delta(previous, current):
+    # Titles added, changed and removed between two catalogs keyed by
+    # normalized title (see entry_fingerprint), each list in key order so the
+    # delta file is as stable as the catalog itself.
+    return {
+        "added": [current[key][0] for key in sorted(current.keys() - previous.keys())],
+        "updated": [current[key][0] for key in sorted(current.keys() & previous.keys())
+                    if current[key] != previous[key]],
+        "removed": [previous[key][0] for key in sorted(previous.keys() - current.keys())]
+    }
+
+
+def publish(store, json_filename, name):
+    # Writes the source sorted by normalized title with stable formatting, a
+    # minified copy, gzip (and brotli, when installed) copies of both, and a
+    # delta against the previously published source, all in one pass over
+    # the store. Returns the delta.
+    previous = read_published(json_filename)
+    current = {}
+    count = 0
+    json_name = json.dumps(name, ensure_ascii=False)
+    with PublishedFile(json_filename) as published, PublishedFile(variant_filename(json_filename, "min")) as minified:
+        published.write('{\n    "name": ' + json_name + ',\n    "downloads": [')
+        minified.write('{"name":' + json_name + ',"downloads":[')
+        for entry in store.entries(sort_by_title=True):
+            published.write((",\n" if count else "\n") + indented_entry(entry))
+            minified.write(("," if count else "") + json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+            current[normalize_title(entry["title"])] = entry_fingerprint(entry)
+            count += 1
+        published.write("\n    ]\n}" if count else "]\n}")
+        minified.write("]}")
+
+    delta = {
+        "generated": datetime.now().isoformat(),
+        "sha256": published.sha256.hexdigest(),
+        "count": count,
+        **catalog_delta(previous, current)
+    }
+    atomic_write(variant_filename(json_filename, "delta"),
+                 json.dumps(delta, ensure_ascii=False, indent=4).encode("utf-8"))
+    return delta
@@ -0,0 +1,62 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
+from metrics import metrics
+
+# "auto" prefers lxml's C parser and falls back to the pure-Python html.parser
+# when lxml is not installed.
+PARSER_BACKEND = "auto"
+PARSE_WORKERS = os.cpu_count() or 1
+
+
+def resolve_backend(name=PARSER_BACKEND):
+    if name != "auto":
+        return name
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+SOUP_BACKEND = resolve_backend()
+
+
+def use_backend(name):
+    global SOUP_BACKEND
+    SOUP_BACKEND = resolve_backend(name)
+
+
+def make_soup(page_content):
+    return BeautifulSoup(page_content, SOUP_BACKEND)
+
+
+class ParseExecutor:
+    # Runs extractors in a process pool so BeautifulSoup never blocks the event
+    # loop. With zero workers extraction runs inline, as it did before. Workers
+    # parse with the backend this process had when the pool started.
+    def __init__(self, workers=PARSE_WORKERS):
+        self.workers = workers
+        self._pool = None
+
+    def start(self):
+        if self.workers and self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=use_backend,
+                                             initargs=(SOUP_BACKEND,))
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def run(self, extract, *args):
+        start = metrics.start()
+        if self._pool is None:
+            result = extract(*args)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool, extract, *args)
+        metrics.stop("parse_seconds", start, extractor=extract.__name__)
+        return result
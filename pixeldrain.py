@@ -0,0 +1,76 @@
+import asyncio
+from engine import read_json
+from logs import log
+
+PIXELDRAIN_API = "https://pixeldrain.com/api/file/"
+PIXELDRAIN_BATCH_SIZE = 100
+PIXELDRAIN_BATCH_DELAY = 0.1
+
+
+def pixeldrain_id(link):
+    return link.rstrip('/').split('/')[-1].split('?')[0]
+
+
+class PixeldrainBatcher:
+    # Collects file IDs requested by concurrent validations and resolves them
+    # with one comma-separated /api/file/{ids}/info call per batch. A batch is
+    # sent once it is full or PIXELDRAIN_BATCH_DELAY after its first ID.
+    def __init__(self, engine, batch_size=PIXELDRAIN_BATCH_SIZE, delay=PIXELDRAIN_BATCH_DELAY):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.delay = delay
+        self.pending = {}
+        self.timer = None
+        self.tasks = set()
+        self.requests = 0
+
+    async def info(self, file_id):
+        # Returns the file's info dict, or None when it could not be looked up.
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(file_id, []).append(future)
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._resolve(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _resolve(self, batch):
+        infos = {}
+        try:
+            infos = await self._fetch(list(batch))
+        finally:
+            for file_id, futures in batch.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(infos.get(file_id))
+
+    async def _fetch(self, ids):
+        url = f"{PIXELDRAIN_API}{','.join(ids)}/info"
+        self.requests += 1
+        try:
+            status, _, data = await self.engine.request(url, read=read_json)
+        except Exception as e:
+            log.warning(f"Pixeldrain batch lookup failed: {str(e)}", ids=len(ids))
+            return {}
+        if status == 200:
+            if isinstance(data, dict):
+                data = [data]
+            return {info["id"]: info for info in data if isinstance(info, dict) and "id" in info}
+        if status != 404 or len(ids) == 1:
+            return {}
+
+        # One missing file fails the whole request with a 404, so split the
+        # batch to isolate it instead of dropping every ID.
+        middle = len(ids) // 2
+        first, second = await asyncio.gather(self._fetch(ids[:middle]), self._fetch(ids[middle:]))
+        return {**first, **second}
@@ -0,0 +1,91 @@
+import enum
+import re
+from datetime import datetime
+
+SIZE_UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30, "TB": 1 << 40}
+SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(KB|MB|GB|TB)", re.IGNORECASE)
+SIZE_UNKNOWN = "Undefined"
+
+
+class LinkHost(enum.IntEnum):
+    OTHER = 0
+    PIXELDRAIN = 1
+    QIWI = 2
+    FICHIER = 3
+
+
+HOST_DOMAINS = (
+    ("pixeldrain.com", LinkHost.PIXELDRAIN),
+    ("qiwi.gg", LinkHost.QIWI),
+    ("1fichier.com", LinkHost.FICHIER)
+)
+
+
+def host_of(uri):
+    for domain, host in HOST_DOMAINS:
+        if domain in uri:
+            return host
+    return LinkHost.OTHER
+
+
+def parse_size(text):
+    # "8 GB" / "2.50 GB" / "700 MB" -> bytes; None when there is no size.
+    match = SIZE_PATTERN.search(text) if text else None
+    if not match:
+        return None
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size):
+    # GB from 1 GiB up, MB below, at most two decimals without trailing
+    # zeros, so page sizes like "8 GB" or "1.5 GB" round-trip unchanged.
+    if size is None:
+        return SIZE_UNKNOWN
+    unit = "GB" if size >= SIZE_UNITS["GB"] else "MB"
+    value = f"{size / SIZE_UNITS[unit]:.2f}".rstrip("0").rstrip(".")
+    return f"{value} {unit}"
+
+
+def parse_timestamp(text):
+    if not text:
+        return None
+    try:
+        return int(datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+class GameRecord:
+    # In-memory catalog entry: size in bytes, upload time as epoch seconds and
+    # one LinkHost per uri, so merges and size picks compare integers. Hydra's
+    # {"title", "uris", "fileSize", "uploadDate"} strings only exist at the
+    # edges: from_entry() when loading and to_entry() when exporting.
+    __slots__ = ("title", "uris", "hosts", "size", "uploaded")
+
+    def __init__(self, title, uris, size=None, uploaded=None):
+        self.title = title
+        self.set_uris(uris)
+        self.size = size
+        self.uploaded = uploaded
+
+    def set_uris(self, uris):
+        # Always a new tuple, so holders of the old one can tell it changed.
+        self.uris = tuple(uris)
+        self.hosts = tuple(host_of(uri) for uri in self.uris)
+
+    @classmethod
+    def from_entry(cls, entry):
+        return cls(entry["title"], entry.get("uris", []), parse_size(entry.get("fileSize")),
+                   parse_timestamp(entry.get("uploadDate")))
+
+    def to_entry(self):
+        return {
+            "title": self.title,
+            "uris": list(self.uris),
+            "fileSize": format_size(self.size),
+            "uploadDate": format_timestamp(self.uploaded)
+        }
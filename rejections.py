@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from files import atomic_write
+
+INVALID_LOG_FILENAME = "invalid_games.jsonl"
+FLUSH_BATCH_SIZE = 100
+FLUSH_INTERVAL_SECONDS = 10
+
+
+class RejectionLog:
+    # Buffers rejected games in memory and appends them to a JSONL log in
+    # batches, so a rejection costs a list append instead of a rewrite of the
+    # whole invalid games file. A batch is written once it is full or
+    # `interval` seconds after its first rejection. export() compacts the log into the
+    # {"updated", "invalid_games"} document uploaded by the workflow.
+    def __init__(self, filename=INVALID_LOG_FILENAME, batch_size=FLUSH_BATCH_SIZE,
+                 interval=FLUSH_INTERVAL_SECONDS):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending = []
+        self.timer = None
+
+    def bootstrap(self, json_filename):
+        # Seed the log from an existing invalid games document the first time
+        # so earlier rejections survive the switch to the append-only format.
+        if os.path.exists(self.filename):
+            return self
+        try:
+            with open(json_filename, 'r', encoding='utf-8') as f:
+                self.pending.extend(json.load(f).get("invalid_games", []))
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        self.flush()
+        return self
+
+    def add(self, title, reason, links=None):
+        invalid_game = {
+            "title": title,
+            "reason": reason,
+            "date": datetime.now().isoformat()
+        }
+        if links:
+            invalid_game["links"] = links
+        self.pending.append(invalid_game)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        elif self.timer is None:
+            try:
+                self.timer = asyncio.get_running_loop().call_later(self.interval, self.flush)
+            except RuntimeError:
+                # Outside the event loop nothing would fire the timer.
+                self.flush()
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(game, ensure_ascii=False) + "\n" for game in self.pending)
+        self.pending = []
+
+    def entries(self):
+        self.flush()
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def export(self, json_filename):
+        data = {"updated": datetime.now().isoformat(), "invalid_games": self.entries()}
+        atomic_write(json_filename, json.dumps(data, ensure_ascii=False, indent=4))
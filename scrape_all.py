@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import os
+from cassette import cassette
+from engine import Engine
+from logs import log
+from metrics import metrics
+from scraper import (RepackGamesAdapter, add_cassette_arguments, add_discovery_argument, add_log_arguments,
+                     add_parser_arguments, cleanup, configure_cassette, configure_parser, write_metrics)
+from scraper_steamgg import LINKS_FILENAME, SteamGGAdapter, load_game_links
+
+
+async def scrape_all(resume=False, steamgg_links=LINKS_FILENAME, prometheus_filename=None, discovery="auto"):
+    # Every site runs on one engine, so they share the connection pool, the
+    # per-host limits and the parse executor.
+    adapters = [RepackGamesAdapter(resume, discovery=discovery)]
+    if os.path.exists(steamgg_links):
+        adapters.append(SteamGGAdapter(load_game_links(steamgg_links)))
+    try:
+        async with Engine() as engine:
+            await engine.run(*adapters)
+    finally:
+        cassette.close()
+        write_metrics(prometheus_filename)
+        await cleanup()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Scrape every supported site in one process")
+    arg_parser.add_argument("--resume", action="store_true", help="resume the repack-games crawl from its checkpoint")
+    arg_parser.add_argument("--steamgg-links", default=LINKS_FILENAME,
+                            help="HTML file listing the steamgg game pages (skipped when missing)")
+    arg_parser.add_argument("--metrics", action="store_true", help="record and write run metrics")
+    arg_parser.add_argument("--prometheus", metavar="FILE", help="also write the metrics in Prometheus text format")
+    add_discovery_argument(arg_parser)
+    add_cassette_arguments(arg_parser)
+    add_parser_arguments(arg_parser)
+    add_log_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    if args.metrics or args.prometheus:
+        metrics.enable()
+    log.configure(args.log_level, args.quiet, args.log_file)
+    configure_cassette(args)
+    configure_parser(args)
+    try:
+        asyncio.run(scrape_all(args.resume, args.steamgg_links, args.prometheus, args.discovery))
+    except KeyboardInterrupt:
+        print("\nScript interrupted by user.")
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    main()
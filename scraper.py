@@ -1,10 +1,31 @@
 import aiohttp
+import argparse
 import asyncio
-from bs4 import BeautifulSoup
-import json
 from datetime import datetime, timedelta
+import json
+import os
 import re
+import time
 from colorama import Fore, init
+from cassette import CASSETTE_DIRNAME, cassette
+from catalog_store import CatalogStore
+from discovery import DISCOVERY_STATE_FILENAME, FULL_CRAWL_INTERVAL_DAYS, DiscoveryState, fetch_changed_posts
+from checkpoint import CHECKPOINT_FILENAME, CHECKPOINT_INTERVAL_SECONDS, CrawlCheckpoint
+from frontier import CrawlFrontier
+from engine import Engine, SiteAdapter, parser, read_json, write_source
+from hosts import host_key
+from http_cache import HTTP_CACHE_FILENAME, ValidatorStore
+from link_cache import LINK_CACHE_FILENAME, LinkCache
+from logs import LEVELS, log
+from metrics import METRICS_FILENAME, metrics
+from output import publish, variant_filename
+from parsing import PARSE_WORKERS, make_soup, use_backend
+from pixeldrain import PixeldrainBatcher, pixeldrain_id
+from records import GameRecord, LinkHost, format_size, parse_size, parse_timestamp
+from rejections import RejectionLog
+from sharding import parse_shard, shard_filenames
+from streaming import VALIDATION_BYTE_CAP, read_text
+from titles import normalize_title
 
 init(autoreset=True)
 
@@ -17,36 +38,138 @@ BASE_URLS = ["https://repack-games.com/category/" + url for url in [
 ]]
 
 JSON_FILENAME = "shisuyssource.json"
+SOURCE_NAME = "Shisuy's source"
 INVALID_JSON_FILENAME = "invalid_games.json"
 MAX_GAMES = 999999
-CONCURRENT_REQUESTS = 100
-REGEX_TITLE = r"(?:\(.*?\)|\s*(Free Download|v\d+(\.\d+)*[a-zA-Z0-9\-]*|Build \d+|P2P|GOG|Repack|Edition.*|FLT|TENOKE)\s*)"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1"
-}
+LISTING_WORKERS = 10
+DETAIL_WORKERS = 60
+VALIDATION_WORKERS = 100
+QUEUE_SIZE = 200
+# A category stops paginating after this many listing pages in a row with no
+# new or newer game on them; 0 walks every page.
+EARLY_STOP_PAGES = 3
+RELATIVE_DATE_PRECISION = (("hour", 3600), ("day", 86400), ("week", 7 * 86400), ("month", 30 * 86400),
+                           ("year", 365 * 86400))
+
+INVALID_LINK_MARKERS = [
+    "file could not be found",
+    "unavailable for legal reasons",
+    "unavailable",
+    "qbittorrent",
+    "torrent",
+    "magnet:",
+    ".torrent"
+]
 
 processed_games_count = 0
+rejections = RejectionLog()
+
+class CatalogIndex:
+    # Maps normalized titles to catalog entries so merging a game is O(1)
+    # instead of a scan of every download. Entries are keyed by identity and
+    # kept in insertion order so entries() matches the original list layout.
+    # Entries are GameRecords. When the downloads are what the store holds,
+    # a snapshot of each entry's fields lets changes() find the few entries a
+    # run added or modified, so saving only writes those.
+    def __init__(self, downloads, stored=False):
+        self._entries = {}
+        self._keys = {}
+        self._groups = {}
+        for entry in downloads:
+            self.add(entry)
+        # The entry itself is held so its id cannot be reused by a new one.
+        self._stored = None
+        if stored:
+            self._stored = {id(entry): (entry, self._keys[id(entry)], entry.title, entry.uris, entry.size,
+                                        entry.uploaded) for entry in downloads}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry, key=None):
+        if key is None:
+            key = normalize_title(entry.title)
+        self._entries[id(entry)] = entry
+        self._keys[id(entry)] = key
+        self._groups.setdefault(key, []).append(entry)
+        return entry
+
+    def remove(self, entry):
+        key = self._keys.pop(id(entry))
+        del self._entries[id(entry)]
+        group = [g for g in self._groups[key] if g is not entry]
+        if group:
+            self._groups[key] = group
+        else:
+            del self._groups[key]
+
+    def update(self, entry, game):
+        # Copies a newer crawl of the game into the existing entry in place.
+        entry.title = game.title
+        entry.set_uris(game.uris)
+        entry.size = game.size
+        entry.uploaded = game.uploaded
+        key = normalize_title(entry.title)
+        if key != self._keys[id(entry)]:
+            self.remove(entry)
+            self.add(entry, key)
+
+    def find(self, key):
+        return self._groups.get(key, [])
 
-class GameLimitReached(Exception):
-    pass
+    def key_of(self, entry):
+        return self._keys[id(entry)]
 
-def normalize_title(title):
-    return re.sub(REGEX_TITLE, "", title).strip()
+    def entries(self):
+        return list(self._entries.values())
 
-def load_existing_data(json_filename):
+    def is_changed(self, entry):
+        # uris is compared by identity: set_uris always makes a new tuple.
+        stored = self._stored.get(id(entry))
+        return (stored is None or stored[1] != self._keys[id(entry)] or stored[2] != entry.title
+                or stored[3] is not entry.uris or stored[4] != entry.size or stored[5] != entry.uploaded)
+
+    def changes(self, kept):
+        # (entries to upsert, title keys to delete) that turn the stored
+        # catalog into `kept`, or None when the catalog was not loaded from
+        # the store and a full sync is needed.
+        if self._stored is None:
+            return None
+        kept_keys = {self._keys[id(entry)] for entry in kept}
+        changed = [entry for entry in kept if self.is_changed(entry)]
+        removed = {stored[1] for stored in self._stored.values()} - kept_keys
+        return changed, removed
+
+def load_existing_data(store, json_filename, bootstrap=True):
+    # The first run against an empty store bootstraps it from the JSON source.
+    # Shards read the JSON directly instead so they never write the store.
+    if not len(store):
+        if not bootstrap:
+            return load_json_source(json_filename)
+        store.import_json(json_filename)
+    return {"name": SOURCE_NAME, "downloads": [GameRecord.from_entry(entry) for entry in store.entries()]}
+
+def load_json_source(json_filename):
     try:
-        with open(json_filename, 'r', encoding='utf-8') as json_file:
-            return json.load(json_file)
+        with open(json_filename, 'r', encoding='utf-8') as f:
+            downloads = json.load(f).get("downloads", [])
     except (FileNotFoundError, json.JSONDecodeError):
-        return {"name": "Shisuy's source", "downloads": []}
+        downloads = []
+    return {"name": SOURCE_NAME, "downloads": [GameRecord.from_entry(entry) for entry in downloads]}
 
-def save_data(json_filename, data):
-    with open(json_filename, "w", encoding="utf-8") as json_file:
-        json.dump(data, json_file, ensure_ascii=False, indent=4)
+def save_data(store, json_filename, data, catalog=None):
+    # With the catalog loaded from the store only its changes are written;
+    # otherwise the store is synced to the whole list.
+    changes = catalog.changes(data["downloads"]) if catalog is not None else None
+    if changes is None:
+        store.sync(game.to_entry() for game in data["downloads"])
+    else:
+        changed, removed = changes
+        store.apply([game.to_entry() for game in changed], removed)
+        log.info(f"Catalog store: {len(changed)} entries written, {len(removed)} removed")
+    delta = publish(store, json_filename, data["name"])
+    log.info(f"Catalog changes: {len(delta['added'])} added, {len(delta['updated'])} updated, "
+             f"{len(delta['removed'])} removed")
 
 def parse_relative_date(date_str):
     now = datetime.now()
@@ -67,63 +190,30 @@ def parse_relative_date(date_str):
     except Exception:
         return now.isoformat()
 
+def relative_date_precision(date_str):
+    for unit, seconds in RELATIVE_DATE_PRECISION:
+        if unit in date_str:
+            return seconds
+    return 0
+
 def log_game_status(status, page, game_title):
     global processed_games_count
     if status == "NEW":
         processed_games_count += 1
-        print(f"{Fore.GREEN}[NEW GAME] Page {page}: {game_title} - Games Processed: {processed_games_count}")
+        log.info(f"[NEW GAME] Page {page}: {game_title} - Games Processed: {processed_games_count}",
+                 "new", Fore.GREEN, page=page, title=game_title)
     elif status == "UPDATED":
-        print(f"{Fore.YELLOW}[UPDATED] Page {page}: {game_title}")
+        log.info(f"[UPDATED] Page {page}: {game_title}", "updated", Fore.YELLOW, page=page, title=game_title)
     elif status == "IGNORED":
-        print(f"{Fore.CYAN}[IGNORED] Page {page}: {game_title}")
+        log.debug(f"[IGNORED] Page {page}: {game_title}", "ignored", Fore.CYAN, page=page, title=game_title)
     elif status == "NO_LINKS":
-        print(f"{Fore.RED}[NO LINKS] Page {page}: {game_title}")
-
-def load_invalid_games():
-    try:
-        with open(INVALID_JSON_FILENAME, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {
-            "updated": datetime.now().isoformat(),
-            "invalid_games": []
-        }
+        log.info(f"[NO LINKS] Page {page}: {game_title}", "no_links", Fore.RED, page=page, title=game_title)
 
 def save_invalid_game(title, reason, links=None):
-    invalid_data = load_invalid_games()
-    invalid_data["updated"] = datetime.now().isoformat()
-    
-    invalid_game = {
-        "title": title,
-        "reason": reason,
-        "date": datetime.now().isoformat()
-    }
-    if links:
-        invalid_game["links"] = links
-        
-    invalid_data["invalid_games"].append(invalid_game)
-    
-    with open(INVALID_JSON_FILENAME, 'w', encoding='utf-8') as f:
-        json.dump(invalid_data, f, ensure_ascii=False, indent=4)
-
-async def fetch_page(session, url, semaphore):
-    async with semaphore:
-        try:
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with session.get(url, headers=HEADERS, timeout=timeout) as response:
-                if response.status == 200:
-                    return await response.text()
-                return None
-        except Exception as e:
-            print(f"Error fetching {url}: {str(e)}")
-            return None
-
-async def fetch_game_details(session, game_url, semaphore):
-    page_content = await fetch_page(session, game_url, semaphore)
-    if not page_content:
-        return None, None, [], None
+    rejections.add(title, reason, links)
 
-    soup = BeautifulSoup(page_content, 'html.parser')
+def extract_game_details(page_content):
+    soup = make_soup(page_content)
     title = soup.find('h1', class_='entry-title').get_text(strip=True) if soup.find('h1', class_='entry-title') else "Unknown Title"
 
     size = "Undefined"
@@ -172,12 +262,14 @@ async def fetch_game_details(session, game_url, semaphore):
 
     return title, size, download_links, upload_date
 
-async def fetch_last_page_num(session, semaphore, base_url):
-    page_content = await fetch_page(session, base_url, semaphore)
-    if not page_content:
-        return 1
+async def fetch_game_details(engine, game_url, validators=None):
+    details = await engine.fetch_extracted(game_url, extract_game_details, validators)
+    if not details:
+        return None, None, [], None
+    return tuple(details)
 
-    soup = BeautifulSoup(page_content, 'html.parser')
+def extract_last_page_num(page_content):
+    soup = make_soup(page_content)
     last_page_tag = soup.find('a', class_='last', string='Last »')
     if last_page_tag:
         match = re.search(r'page/(\d+)', last_page_tag['href'])
@@ -185,86 +277,107 @@ async def fetch_last_page_num(session, semaphore, base_url):
             return int(match.group(1))
     return 1
 
-async def process_page(session, page_url, semaphore, existing_data, page_num):
-    global processed_games_count
-    if processed_games_count >= MAX_GAMES:
-        raise GameLimitReached()
+async def fetch_last_page_num(engine, base_url, validators=None):
+    last_page_num = await engine.fetch_extracted(base_url, extract_last_page_num, validators)
+    return last_page_num or 1
 
-    page_content = await fetch_page(session, page_url, semaphore)
-    if not page_content:
-        return
-
-    soup = BeautifulSoup(page_content, 'html.parser')
-    articles = soup.find_all('div', class_='articles-content')
-    if not articles:
-        return
-
-    remaining_games = MAX_GAMES - processed_games_count
-    tasks = []
-    
-    for article in articles:
-        if len(tasks) >= remaining_games:
-            break
-        
+def extract_listing_items(page_content):
+    # [url, title, relative date] for each game on a listing page; title and
+    # date are None when the listing does not show them.
+    soup = make_soup(page_content)
+    items = []
+    for article in soup.find_all('div', class_='articles-content'):
         for li in article.find_all('li'):
-            if len(tasks) >= remaining_games:
-                break
-                
             a_tag = li.find('a', href=True)
-            if a_tag and 'href' in a_tag.attrs:
-                tasks.append(fetch_game_details(session, a_tag['href'], semaphore))
-
-    games = await asyncio.gather(*tasks, return_exceptions=True)
-    for game in games:
-        if isinstance(game, Exception):
-            print(f"Exception occurred while fetching game details: {game}")
-            continue
+            if not a_tag:
+                continue
+            heading = li.find(['h1', 'h2', 'h3'])
+            title = (heading.get_text(strip=True) if heading else None) or a_tag.get('title') or a_tag.get_text(strip=True)
+            date_element = li.select_one('.time-article a')
+            items.append([a_tag['href'], title or None, date_element.get_text(strip=True) if date_element else None])
+    return items
 
-        if processed_games_count >= MAX_GAMES:
-            break
+def known_uploads(catalog):
+    # Newest upload time per normalized title, taken before a crawl so games
+    # merged during it do not count as already known.
+    known = {}
+    for entry in catalog.entries():
+        key = catalog.key_of(entry)
+        known[key] = max(known.get(key, 0), entry.uploaded or 0)
+    return known
 
-        title, size, links, upload_date = game
-        if not links:
-            log_game_status("NO_LINKS", page_num, title)
-            continue
+def is_listing_news(known, title, date_str):
+    # False only when the catalog already had the title with an upload date
+    # at least as recent as the listing's, give or take the listing date's
+    # precision ("3 days ago" is only good to a day).
+    if not title or not date_str:
+        return True
+    key = normalize_title(title)
+    if key not in known:
+        return True
+    listed = parse_timestamp(parse_relative_date(date_str))
+    return listed > known[key] + relative_date_precision(date_str)
 
-        if "FULL UNLOCKED" in title.upper() or "CRACKSTATUS" in title.upper():
-            save_invalid_game(title, "Ignored title pattern")
-            print(f"Ignoring game with title: {title}")
-            continue
+def extract_qiwi_size(page_content):
+    soup = make_soup(page_content)
+    download_span = soup.find('span', string=re.compile(r'Download \d+'))
+    if download_span:
+        size_match = re.search(r'(\d+\.?\d*)\s*(GB|MB|KB)', download_span.text)
+        if size_match:
+            return f"{size_match.group(1)} {size_match.group(2)}"
+    return None
 
-        title_normalized = normalize_title(title)
-        # Find all games with the same normalized title
-        same_games = [g for g in existing_data["downloads"] if normalize_title(g["title"]) == title_normalized]
-        
-        if same_games:
-            # Sort by upload date, most recent first
-            same_games.sort(key=lambda x: x.get("uploadDate", ""), reverse=True)
-            most_recent = same_games[0]
-            
-            # If current game is newer, update the most recent entry
-            if upload_date and upload_date > most_recent.get("uploadDate", ""):
-                most_recent.update({
-                    "title": title,
-                    "uris": links,
-                    "fileSize": size,
-                    "uploadDate": upload_date
-                })
-                log_game_status("UPDATED", page_num, title)
-                
-                # Remove other versions of the same game
-                existing_data["downloads"] = [g for g in existing_data["downloads"] 
-                                           if normalize_title(g["title"]) != title_normalized or g == most_recent]
-            else:
-                log_game_status("IGNORED", page_num, title)
+async def fetch_listing(engine, page_url, validators=None, known=None):
+    items = await engine.fetch_extracted(page_url, extract_listing_items, validators)
+    if not items:
+        return []
+    game_links = []
+    for item in items:
+        # Listings cached before titles and dates were extracted hold bare URLs.
+        game_url, title, date_str = item if isinstance(item, list) else (item, None, None)
+        if known is None or is_listing_news(known, title, date_str):
+            game_links.append(game_url)
         else:
-            existing_data["downloads"].append({
-                "title": title,
-                "uris": links,
-                "fileSize": size,
-                "uploadDate": upload_date
-            })
-            log_game_status("NEW", page_num, title)
+            log.debug(f"[KNOWN] {title} ({date_str})", "known", Fore.CYAN, title=title, url=game_url)
+    return game_links
+
+def merge_game(catalog, game, page_num):
+    title, size, links, upload_date = game
+    if not links:
+        log_game_status("NO_LINKS", page_num, title)
+        return None
+
+    if "FULL UNLOCKED" in title.upper() or "CRACKSTATUS" in title.upper():
+        save_invalid_game(title, "Ignored title pattern")
+        log.info(f"Ignoring game with title: {title}", "ignored_pattern", title=title)
+        return None
+
+    status, entry = merge_entry(catalog, GameRecord(title, links, parse_size(size), parse_timestamp(upload_date)))
+    log_game_status(status, page_num, title)
+    return entry
+
+def merge_entry(catalog, game):
+    # Returns ("NEW" | "UPDATED", entry) or ("IGNORED", None). A game replaces
+    # the most recent entry with its title only when its uploadDate is newer.
+    title_normalized = normalize_title(game.title)
+    same_games = catalog.find(title_normalized)
+
+    if same_games:
+        most_recent = max(same_games, key=lambda x: x.uploaded or 0)
+
+        # If current game is newer, update the most recent entry
+        if game.uploaded and game.uploaded > (most_recent.uploaded or 0):
+            catalog.update(most_recent, game)
+
+            # Remove other versions of the same game
+            for game_entry in list(same_games):
+                if game_entry is not most_recent:
+                    catalog.remove(game_entry)
+            return "UPDATED", most_recent
+
+        return "IGNORED", None
+
+    return "NEW", catalog.add(game, title_normalized)
 
 async def get_file_size(session, link, headers, timeout):
     try:
@@ -281,125 +394,176 @@ async def get_file_size(session, link, headers, timeout):
         pass
     return None
 
-async def validate_single_link(session, link, semaphore, game_title):
+async def validate_single_link(engine, link, game_title, pixeldrain=None):
+    if cassette.replaying:
+        return cassette.verdict(link)
+    start = metrics.start()
     try:
-        async with semaphore:
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            if "pixeldrain.com" in link:
-                file_id = link.split('/')[-1]
-                api_url = f"https://pixeldrain.com/api/file/{file_id}/info"
-                
-                try:
-                    async with session.get(api_url, headers=HEADERS, timeout=timeout) as response:
-                        if response.status == 200:
-                            json_data = await response.json()
-                            
-                            if json_data.get('name', '').lower().endswith(('.torrent', '.magnet')):
-                                print(f"{Fore.RED}[TORRENT DETECTED] {game_title}: {link}")
-                                return (None, None)
-                                
-                            if 'size' in json_data:
-                                size_bytes = int(json_data['size'])
-                                if size_bytes > 1073741824:
-                                    file_size = f"{size_bytes / 1073741824:.2f} GB"
-                                else:
-                                    file_size = f"{size_bytes / 1048576:.2f} MB"
-                                print(f"{Fore.GREEN}[VALID - Size: {file_size}] {game_title} - pixeldrain: {link}")
-                                return (link, file_size)
-                except Exception as e:
-                    print(f"{Fore.YELLOW}[DEBUG] Pixeldrain API error: {str(e)}")
-            
-            async with session.get(link, headers=HEADERS, timeout=timeout) as response:
-                if response.status != 200:
-                    print(f"{Fore.RED}[INVALID] {game_title} - Status {response.status}: {link}")
-                    return (None, None)
-                
-                result = await response.text()
-                soup = BeautifulSoup(result, 'html.parser')
-                
-                if any(text in result.lower() for text in [
-                    "file could not be found",
-                    "unavailable for legal reasons",
-                    "unavailable",
-                    "qbittorrent",
-                    "torrent",
-                    "magnet:",
-                    ".torrent"
-                ]):
-                    print(f"{Fore.RED}[INVALID/TORRENT] {game_title}: {link}")
-                    return (None, None)
-
-                file_size = None
-                
-                if "qiwi.gg" in link:
-                    download_span = soup.find('span', string=re.compile(r'Download \d+'))
-                    if download_span:
-                        size_match = re.search(r'(\d+\.?\d*)\s*(GB|MB|KB)', download_span.text)
-                        if size_match:
-                            file_size = f"{size_match.group(1)} {size_match.group(2)}"
-
-                domain = "1fichier" if "1fichier.com" in link else "qiwi" if "qiwi.gg" in link else "pixeldrain"
-                size_info = f" - Size: {file_size}" if file_size else ""
-                print(f"{Fore.GREEN}[VALID{size_info}] {game_title} - {domain}: {link}")
-                
-                return (link, file_size)
+        result = await validate_link_once(engine, link, game_title, pixeldrain)
+    except Exception as e:
+        metrics.inc("validate_errors", host=host_key(link))
+        log.error(f"[ERROR] {game_title} - {link}: {str(e)}", "link_error", Fore.RED, title=game_title, link=link)
+        return (None, None)
+    metrics.stop("validate_seconds", start, host=host_key(link))
+    metrics.inc("links_checked", host=host_key(link), valid=bool(result[0]))
+    if cassette.recording:
+        cassette.record_verdict(link, result)
+    return result
 
+def check_pixeldrain_info(json_data, link, game_title):
+    # Returns a verdict from the file's API info, or None when the info is not
+    # conclusive and the file page has to be fetched instead.
+    if json_data.get('name', '').lower().endswith(('.torrent', '.magnet')):
+        log.info(f"[TORRENT DETECTED] {game_title}: {link}", "invalid", Fore.RED, title=game_title, link=link)
+        return (None, None)
+
+    if 'size' in json_data:
+        size_bytes = int(json_data['size'])
+        if size_bytes > 1073741824:
+            file_size = f"{size_bytes / 1073741824:.2f} GB"
+        else:
+            file_size = f"{size_bytes / 1048576:.2f} MB"
+        log.info(f"[VALID - Size: {file_size}] {game_title} - pixeldrain: {link}", "valid", Fore.GREEN,
+                 title=game_title, link=link, size=file_size)
+        return (link, file_size)
+    return None
+
+async def read_link_page(response):
+    # Stop reading as soon as an invalid marker shows up.
+    return await read_text(response, VALIDATION_BYTE_CAP, INVALID_LINK_MARKERS)
+
+async def validate_link_once(engine, link, game_title, pixeldrain=None):
+    # Raises on network errors that outlast engine.request's retries; any
+    # other failure is a definite verdict on the link.
+    try:
+        if "pixeldrain.com" in link and pixeldrain is not None:
+            json_data = await pixeldrain.info(pixeldrain_id(link))
+            verdict = check_pixeldrain_info(json_data, link, game_title) if json_data else None
+            if verdict is not None:
+                return verdict
+
+        if "pixeldrain.com" in link and pixeldrain is None:
+            api_url = f"https://pixeldrain.com/api/file/{pixeldrain_id(link)}/info"
+            try:
+                status, _, json_data = await engine.request(api_url, read=read_json)
+                if status == 200:
+                    verdict = check_pixeldrain_info(json_data, link, game_title)
+                    if verdict is not None:
+                        return verdict
+            except Exception as e:
+                log.debug(f"[DEBUG] Pixeldrain API error: {str(e)}", color=Fore.YELLOW, link=link)
+
+        status, _, body = await engine.request(link, read=read_link_page)
+        if status != 200:
+            log.info(f"[INVALID] {game_title} - Status {status}: {link}", "invalid", Fore.RED,
+                     title=game_title, link=link, status=status)
+            return (None, None)
+
+        result, marker = body
+        if marker:
+            log.info(f"[INVALID/TORRENT] {game_title}: {link}", "invalid", Fore.RED,
+                     title=game_title, link=link, marker=marker)
+            return (None, None)
+
+        # Parsed after the slot and the connection are released, so time
+        # queued for the parse pool is not counted as request latency.
+        file_size = await parser.run(extract_qiwi_size, result) if "qiwi.gg" in link else None
+
+        domain = "1fichier" if "1fichier.com" in link else "qiwi" if "qiwi.gg" in link else "pixeldrain"
+        size_info = f" - Size: {file_size}" if file_size else ""
+        log.info(f"[VALID{size_info}] {game_title} - {domain}: {link}", "valid", Fore.GREEN,
+                 title=game_title, link=link, size=file_size)
+
+        return (link, file_size)
+
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        raise
     except Exception as e:
-        print(f"{Fore.RED}[ERROR] {game_title} - {link}: {str(e)}")
+        log.error(f"[ERROR] {game_title} - {link}: {str(e)}", "link_error", Fore.RED, title=game_title, link=link)
         return (None, None)
 
-async def validate_links(session, games):
-    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
-    print(f"\n{Fore.YELLOW}Starting link validation...{Fore.RESET}")
-    
-    games_to_keep = []
-    total_links = sum(len(game["uris"]) for game in games)
-    validated = 0
-    
-    for game in games:
-        if not game["uris"]:
-            save_invalid_game(game["title"], "No links available")
-            continue
-            
-        print(f"\n{Fore.CYAN}Validating: {game['title']}{Fore.RESET}")
-        tasks = [validate_single_link(session, link, semaphore, game['title']) for link in game["uris"]]
-        results = await asyncio.gather(*tasks)
-        
-        valid_links = []
-        invalid_links = []
-        sizes = []
-        
-        for link, size in results:
-            if link:
-                valid_links.append(link)
-                if size:
-                    sizes.append(size)
-            else:
-                invalid_links.append(link)
-        
-        if valid_links and not (len(valid_links) == 1 and "1fichier.com" in valid_links[0]):
-            game["uris"] = valid_links
-            if sizes:
-                max_size = max(sizes, key=lambda x: float(x.split()[0]) * (1024 if x.endswith('GB') else 1))
-                game["fileSize"] = max_size
-                print(f"{Fore.BLUE}[SIZE UPDATE] {game['title']} - Set to {max_size}")
-            games_to_keep.append(game)
-            validated += len(valid_links)
+async def check_link(engine, link, game_title, link_cache=None, pixeldrain=None):
+    if link_cache is None:
+        return await validate_single_link(engine, link, game_title, pixeldrain)
+    cached = link_cache.lookup(link)
+    if cached is not None:
+        return cached
+    result = await validate_single_link(engine, link, game_title, pixeldrain)
+    link_cache.record(link, result)
+    return result
+
+async def validate_game(engine, game, link_cache=None, pixeldrain=None):
+    # Returns True to keep the game, False to drop it, or None when the game's
+    # links were replaced by a newer merge while validation was in flight.
+    uris, hosts = game.uris, game.hosts
+    if not uris:
+        save_invalid_game(game.title, "No links available")
+        return False
+
+    log.debug(f"Validating: {game.title}", color=Fore.CYAN)
+    tasks = [check_link(engine, link, game.title, link_cache, pixeldrain) for link in uris]
+    results = await asyncio.gather(*tasks)
+    if uris is not game.uris:
+        return None
+
+    valid_links = []
+    valid_hosts = []
+    invalid_links = []
+    sizes = []
+
+    for original_link, host, (link, size) in zip(uris, hosts, results):
+        if link:
+            valid_links.append(link)
+            valid_hosts.append(host)
+            size = parse_size(size)
+            if size:
+                sizes.append(size)
         else:
-            reason = "Only 1fichier links" if (len(valid_links) == 1 and "1fichier.com" in valid_links[0]) else "All links invalid"
-            save_invalid_game(game["title"], reason, {
-                "valid_links": valid_links,
-                "invalid_links": invalid_links,
-                "original_links": game["uris"]
-            })
-            print(f"{Fore.RED}[REMOVED] {game['title']} - {reason}")
-        
-        print(f"Progress: {validated}/{total_links} links checked")
-    
+            invalid_links.append(original_link)
+
+    only_1fichier = valid_hosts == [LinkHost.FICHIER]
+    if valid_links and not only_1fichier:
+        # Left alone when unchanged so the store does not rewrite the entry.
+        if tuple(valid_links) != uris:
+            game.set_uris(valid_links)
+        if sizes and max(sizes) != game.size:
+            game.size = max(sizes)
+            log.info(f"[SIZE UPDATE] {game.title} - Set to {format_size(game.size)}", color=Fore.BLUE,
+                     title=game.title, size=game.size)
+        return True
+
+    reason = "Only 1fichier links" if only_1fichier else "All links invalid"
+    save_invalid_game(game.title, reason, {
+        "valid_links": valid_links,
+        "invalid_links": invalid_links,
+        "original_links": list(uris)
+    })
+    log.info(f"[REMOVED] {game.title} - {reason}", "removed", Fore.RED, title=game.title, reason=reason)
+    return False
+
+async def validate_links(engine, games, link_cache=None):
+    pixeldrain = PixeldrainBatcher(engine)
+    log.info("Starting link validation...", color=Fore.YELLOW)
+
+    total_links = sum(len(game.uris) for game in games)
+    validated = 0
+
+    # Games are checked concurrently (the limiter bounds the traffic) so
+    # pixeldrain lookups from different games can share a batch.
+    async def check(game):
+        nonlocal validated
+        keep = await validate_game(engine, game, link_cache, pixeldrain)
+        if keep:
+            validated += len(game.uris)
+        log.debug(f"Progress: {validated}/{total_links} links checked")
+        return keep
+
+    verdicts = await asyncio.gather(*(check(game) for game in games))
+    games_to_keep = [game for game, keep in zip(games, verdicts) if keep]
+
     games[:] = games_to_keep
-    print(f"\n{Fore.GREEN}Validation completed: {validated} valid links found")
-    print(f"Games remaining after validation: {len(games_to_keep)}")
+    log.info(f"Validation completed: {validated} valid links found", color=Fore.GREEN)
+    log.info(f"Games remaining after validation: {len(games_to_keep)}")
 
 async def cleanup():
     tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
@@ -409,55 +573,443 @@ async def cleanup():
         await asyncio.gather(*tasks, return_exceptions=True)
 
 def compare_sizes(size1, size2):
-    size1_value, size1_unit = size1.split()
-    size2_value, size2_unit = size2.split()
-    size1_value = float(size1_value)
-    size2_value = float(size2_value)
-    if size1_unit == size2_unit:
-        return size1_value - size2_value
-    elif size1_unit == "GB" and size2_unit == "MB":
-        return size1_value - (size2_value / 1024)
-    elif size1_unit == "MB" and size2_unit == "GB":
-        return (size1_value / 1024) - size2_value
-    return 0
+    # Sizes are bytes now; unknown sizes compare as zero.
+    return (size1 or 0) - (size2 or 0)
 
-async def scrape_games():
-    global processed_games_count
-    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
-    existing_data = load_existing_data(JSON_FILENAME)
+async def run_stage(name, queue, workers, handle):
+    # Run `workers` consumers over `queue`; returns the tasks so the caller can
+    # cancel them once the queue has been joined.
+    async def worker():
+        while True:
+            item = await queue.get()
+            metrics.gauge("queue_depth", queue.qsize(), stage=name)
+            start = metrics.start()
+            try:
+                await handle(item)
+            except Exception as e:
+                metrics.inc("stage_errors", stage=name)
+                log.error(f"Exception occurred in pipeline stage: {e}", "stage_error", stage=name)
+            finally:
+                metrics.stop("stage_seconds", start, stage=name)
+                queue.task_done()
+    return [asyncio.create_task(worker()) for _ in range(workers)]
+
+async def stop_stage(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def crawl_pipeline(engine, catalog, validators, frontier, link_cache=None, checkpoint=None,
+                         shard=None, changed_posts=None, early_stop_pages=EARLY_STOP_PAGES, known=None):
+    # Discovery -> listing -> detail -> merge -> validation, connected by
+    # bounded queues so each stage applies backpressure to the one before it.
+    # With a shard only its listing pages are crawled and only its titles
+    # among the untouched catalog entries are validated. With changed_posts
+    # (from the sitemaps) those detail pages replace category pagination.
+    # With known (see known_uploads) listing pages only send games that are
+    # new or newer than the catalog's to the detail stage, and a category
+    # stops paginating once early_stop_pages of its pages in a row had none.
+    if checkpoint is None:
+        checkpoint = CrawlCheckpoint()
+    listing_queue = asyncio.Queue(QUEUE_SIZE)
+    detail_queue = asyncio.Queue(QUEUE_SIZE)
+    merge_queue = asyncio.Queue(QUEUE_SIZE)
+    validation_queue = asyncio.Queue(QUEUE_SIZE)
+    verdicts = {}
+    # Holds every entry sent to validation so ids stay unique for the run.
+    enqueued = {}
+    validated = 0
+    pixeldrain = PixeldrainBatcher(engine)
+    # Per category: queued page numbers in order, how many games each page
+    # sent on, and the last page worth fetching once pagination stopped.
+    listing_order = {}
+    listing_news = {}
+    stop_after = {}
+
+    # Entries validated before a resumed run keep their verdicts.
+    for entry, keep in zip(catalog.entries(), checkpoint.verdicts):
+        if keep is not None:
+            verdicts[id(entry)] = keep
+            enqueued[id(entry)] = entry
+
+    def save_checkpoint():
+        checkpoint.save(catalog, frontier, verdicts, processed_games_count)
+
+    async def autosave():
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL_SECONDS)
+            save_checkpoint()
+
+    async def requeue_pending():
+        for game_url, page_num in list(checkpoint.pending_details.items()):
+            await detail_queue.put((game_url, page_num))
+
+    async def discover(base_url):
+        last_page_num = await fetch_last_page_num(engine, base_url, validators)
+        for page_num in range(1, last_page_num + 1):
+            if processed_games_count >= MAX_GAMES:
+                break
+            if shard is not None and not shard.owns_url(f"{base_url}/page/{page_num}"):
+                continue
+            if not checkpoint.is_page_done(base_url, page_num):
+                listing_order.setdefault(base_url, []).append(page_num)
+                await listing_queue.put((base_url, page_num))
+
+    def note_listing(base_url, page_num, news):
+        results = listing_news.setdefault(base_url, {})
+        results[page_num] = news
+        if not early_stop_pages or base_url in stop_after:
+            return
+        run = 0
+        for page in listing_order.get(base_url, ()):
+            run = run + 1 if results.get(page) == 0 else 0
+            if run >= early_stop_pages:
+                stop_after[base_url] = page
+                log.info(f"Stopping {base_url} after page {page}: {run} listing pages in a row had nothing new",
+                         "early_stop")
+                return
+
+    async def queue_changed_posts():
+        for game_url in frontier.claim_all(changed_posts):
+            if shard is None or shard.owns_url(game_url):
+                checkpoint.pending_details[game_url] = 0
+                await detail_queue.put((game_url, 0))
+
+    async def handle_listing(item):
+        base_url, page_num = item
+        if processed_games_count >= MAX_GAMES or page_num > stop_after.get(base_url, page_num):
+            return
+        game_links = await fetch_listing(engine, f"{base_url}/page/{page_num}", validators, known=known)
+        # Counted before the frontier drops games another category already
+        # queued, so overlapping categories do not stop each other.
+        note_listing(base_url, page_num, len(game_links))
+        for game_url in frontier.claim_all(game_links):
+            checkpoint.pending_details[game_url] = page_num
+            await detail_queue.put((game_url, page_num))
+        checkpoint.page_done(base_url, page_num)
+
+    async def handle_detail(item):
+        game_url, page_num = item
+        if processed_games_count >= MAX_GAMES:
+            return
+        game = await fetch_game_details(engine, game_url, validators)
+        await merge_queue.put((game_url, game, page_num))
+
+    async def handle_merge(item):
+        game_url, game, page_num = item
+        if processed_games_count >= MAX_GAMES:
+            return
+        entry = merge_game(catalog, game, page_num)
+        checkpoint.pending_details.pop(game_url, None)
+        if entry is not None:
+            checkpoint.crawled.add(catalog.key_of(entry))
+            enqueued[id(entry)] = entry
+            await validation_queue.put(entry)
+
+    async def handle_validation(game):
+        nonlocal validated
+        keep = await validate_game(engine, game, link_cache, pixeldrain)
+        if keep is None:
+            return
+        verdicts[id(game)] = keep
+        if keep:
+            validated += len(game.uris)
+        log.debug(f"Progress: {validated} valid links, {len(verdicts)} games checked")
+
+    async def feed_existing():
+        for entry in catalog.entries():
+            if shard is not None and not shard.owns(catalog.key_of(entry)):
+                continue
+            if id(entry) not in enqueued:
+                enqueued[id(entry)] = entry
+                await validation_queue.put(entry)
+
+    log.info("Starting crawl and link validation...", color=Fore.YELLOW)
+    listing_workers = await run_stage("listing", listing_queue, LISTING_WORKERS, handle_listing)
+    detail_workers = await run_stage("detail", detail_queue, DETAIL_WORKERS, handle_detail)
+    merge_workers = await run_stage("merge", merge_queue, 1, handle_merge)
+    validation_workers = await run_stage("validation", validation_queue, VALIDATION_WORKERS, handle_validation)
+    autosave_task = asyncio.create_task(autosave())
 
     try:
-        async with aiohttp.ClientSession() as session:
-            for base_url in BASE_URLS:
-                if processed_games_count >= MAX_GAMES:
-                    break
-                    
-                try:
-                    last_page_num = await fetch_last_page_num(session, semaphore, base_url)
-                    for page_num in range(1, last_page_num + 1):
-                        if processed_games_count >= MAX_GAMES:
-                            break
-                        page_url = f"{base_url}/page/{page_num}"
-                        await process_page(session, page_url, semaphore, existing_data, page_num)
-                except GameLimitReached:
-                    break
-
-            await validate_links(session, existing_data["downloads"])
-            
-            save_data(JSON_FILENAME, existing_data)
-            print(f"\nScraping finished. Total games processed: {processed_games_count}")
-    
+        await requeue_pending()
+        if changed_posts is None:
+            await asyncio.gather(*(discover(base_url) for base_url in BASE_URLS))
+        else:
+            await queue_changed_posts()
+        await listing_queue.join()
+        await detail_queue.join()
+        await merge_queue.join()
+        # Entries untouched by the crawl still need validating.
+        await feed_existing()
+        await validation_queue.join()
+    finally:
+        save_checkpoint()
+        for workers in (listing_workers, detail_workers, merge_workers, validation_workers, [autosave_task]):
+            await stop_stage(workers)
+
+    games_to_keep = [entry for entry in catalog.entries() if verdicts.get(id(entry))]
+    log.info(f"Validation completed: {validated} valid links found", color=Fore.GREEN)
+    log.info(f"Games remaining after validation: {len(games_to_keep)}")
+    log.info(f"Pixeldrain info requests: {pixeldrain.requests}")
+    return games_to_keep
+
+class RepackGamesAdapter(SiteAdapter):
+    # repack-games.com: category pagination, detail pages, link validation and
+    # the SQLite-backed catalog, all on the engine's shared session. A shard
+    # reads the catalog but writes its result to a partial source, and keeps
+    # its own checkpoint, caches and rejection log so shards can share a
+    # directory; merge_shards() folds the partials into the final source.
+    # Replaying a cassette rebuilds the catalog from scratch into replay
+    # variants of the output files and leaves the live state alone.
+    name = "repack-games"
+
+    def __init__(self, resume=False, shard=None, discovery="auto", early_stop=EARLY_STOP_PAGES):
+        self.resume = resume
+        self.shard = shard
+        self.discovery = discovery
+        self.early_stop = early_stop
+
+    def filename(self, filename):
+        return filename if self.shard is None else self.shard.filename(filename)
+
+    async def run(self, engine):
+        if cassette.replaying:
+            return await self.replay(engine)
+        global processed_games_count
+        store = CatalogStore().open()
+        existing_data = load_existing_data(store, JSON_FILENAME, bootstrap=self.shard is None)
+        checkpoint = CrawlCheckpoint(self.filename(CHECKPOINT_FILENAME))
+        frontier = CrawlFrontier()
+        if self.resume:
+            checkpoint.load()
+            if checkpoint.entries is not None:
+                log.info(f"Resuming crawl: {sum(len(pages) for pages in checkpoint.pages_done.values())} listing pages done, "
+                         f"{len(checkpoint.pending_details)} detail pages pending")
+                existing_data["downloads"] = [GameRecord.from_entry(entry) for entry in checkpoint.entries]
+                frontier.seen.update(checkpoint.seen)
+                processed_games_count = checkpoint.processed
+        # A resumed catalog holds merges the store has not seen yet.
+        catalog = CatalogIndex(existing_data["downloads"], stored=checkpoint.entries is None)
+        # A recording run fetches and validates everything, so the cassette
+        # holds every body and verdict a replay needs: no conditional
+        # requests, no link cache and no skipping of known games.
+        recording = cassette.recording
+        validators = None if recording else ValidatorStore(self.filename(HTTP_CACHE_FILENAME)).load()
+        link_cache = None if recording else LinkCache(self.filename(LINK_CACHE_FILENAME)).load()
+        known = None if recording else known_uploads(catalog)
+        rejections.filename = self.filename(rejections.filename)
+        if self.shard is None:
+            rejections.bootstrap(INVALID_JSON_FILENAME)
+        discovery = DiscoveryState(self.filename(DISCOVERY_STATE_FILENAME)).load()
+        started = time.time()
+
+        try:
+            changed_posts = None
+            # A resumed full crawl finishes as one.
+            if not checkpoint.pages_done and (self.discovery == "sitemap" or
+                                              (self.discovery == "auto" and not discovery.full_crawl_due())):
+                since = discovery.since() if discovery.last_success else 0
+                changed_posts = await fetch_changed_posts(engine, since, validators)
+                if changed_posts is None:
+                    log.warning("No dated sitemap or feed found, paginating every category instead")
+                else:
+                    log.info(f"Sitemaps and feeds list {len(changed_posts)} posts changed since "
+                             f"{datetime.fromtimestamp(since).isoformat()}")
+
+            existing_data["downloads"] = await crawl_pipeline(
+                engine, catalog, validators, frontier, link_cache, checkpoint, self.shard, changed_posts,
+                0 if recording else self.early_stop, known)
+
+            if self.shard is None:
+                save_data(store, JSON_FILENAME, existing_data, catalog)
+            else:
+                write_source(self.filename(JSON_FILENAME), SOURCE_NAME,
+                             [game.to_entry() for game in existing_data["downloads"]],
+                             crawled=sorted(checkpoint.crawled))
+            checkpoint.clear()
+            discovery.finish(started, full_crawl=changed_posts is None)
+            discovery.save()
+            if not recording:
+                log.info(f"HTTP cache: {validators.summary()}")
+                log.info(f"Link cache: {link_cache.summary()}")
+            log.info(f"Duplicate detail fetches avoided: {frontier.duplicates}")
+            log.info(f"Scraping finished. Total games processed: {processed_games_count}")
+        finally:
+            store.close()
+            if not recording:
+                validators.save()
+                link_cache.save()
+            if self.shard is None:
+                rejections.export(INVALID_JSON_FILENAME)
+            else:
+                rejections.flush()
+
+    async def replay(self, engine):
+        # No HTTP cache (every page is re-extracted) and no link cache (every
+        # verdict comes from the cassette).
+        def replay_filename(filename):
+            return self.filename(variant_filename(filename, "replay"))
+
+        catalog = CatalogIndex([])
+        checkpoint = CrawlCheckpoint(replay_filename(CHECKPOINT_FILENAME))
+        rejections.filename = replay_filename(rejections.filename)
+        changed_posts = None
+        if self.discovery == "sitemap":
+            changed_posts = await fetch_changed_posts(engine, 0)
+        try:
+            games = await crawl_pipeline(engine, catalog, None, CrawlFrontier(), checkpoint=checkpoint,
+                                         shard=self.shard, changed_posts=changed_posts, early_stop_pages=0)
+            games.sort(key=lambda game: normalize_title(game.title))
+            write_source(replay_filename(JSON_FILENAME), SOURCE_NAME, [game.to_entry() for game in games])
+            checkpoint.clear()
+            log.info(f"Rebuilt {len(games)} games into {replay_filename(JSON_FILENAME)}")
+        finally:
+            rejections.export(replay_filename(INVALID_JSON_FILENAME))
+            log.info(f"Cassette: {cassette.summary()}")
+
+def load_shard_result(filename):
+    # (games, title keys the shard crawled a new or newer game into)
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [GameRecord.from_entry(entry) for entry in data.get("downloads", [])], set(data.get("crawled", []))
+
+def merge_shards(count):
+    # Folds the partial sources of `--shard i/N` runs, in shard order, with the
+    # crawl's own rule (newest uploadDate per title wins), then saves the
+    # result like a single run would. Refuses to publish if a shard is missing.
+    # A shard's untouched copy of a title another shard crawled is stale: the
+    # crawling shard kept the newer game or rejected it, and either way a
+    # single run would not have kept the old one.
+    partials = shard_filenames(JSON_FILENAME, count)
+    missing = [filename for filename in partials if not os.path.exists(filename)]
+    if missing:
+        raise FileNotFoundError(f"Missing shard results: {', '.join(missing)}")
+
+    results = [load_shard_result(filename) for filename in partials]
+    catalog = CatalogIndex([])
+    stale = 0
+    for index, (games, crawled) in enumerate(results):
+        crawled_elsewhere = set().union(*(other for i, (_, other) in enumerate(results) if i != index))
+        for game in games:
+            key = normalize_title(game.title)
+            if key not in crawled and key in crawled_elsewhere:
+                stale += 1
+                continue
+            merge_entry(catalog, game)
+    if stale:
+        log.info(f"Dropped {stale} untouched entries that another shard crawled")
+
+    store = CatalogStore().open()
+    try:
+        save_data(store, JSON_FILENAME, {"name": SOURCE_NAME, "downloads": catalog.entries()})
+    finally:
+        store.close()
+
+    # Shard rejection logs are consumed so a repeated merge adds them once.
+    rejections.bootstrap(INVALID_JSON_FILENAME)
+    for filename in shard_filenames(rejections.filename, count):
+        rejections.pending.extend(RejectionLog(filename).entries())
+        if os.path.exists(filename):
+            os.remove(filename)
+    rejections.export(INVALID_JSON_FILENAME)
+    log.info(f"Merged {count} shards into {len(catalog)} games in {JSON_FILENAME}")
+
+def write_metrics(prometheus_filename=None):
+    if not metrics.enabled:
+        return
+    metrics.write_json(METRICS_FILENAME)
+    if prometheus_filename:
+        metrics.write_prometheus(prometheus_filename)
+    log.info(f"Metrics written to {METRICS_FILENAME}")
+
+async def scrape_games(resume=False, prometheus_filename=None, shard=None, discovery="auto",
+                       early_stop=EARLY_STOP_PAGES):
+    try:
+        async with Engine() as engine:
+            await engine.run(RepackGamesAdapter(resume, shard, discovery, early_stop))
     except Exception as e:
-        print(f"Error: {str(e)}")
+        log.error(f"Error: {str(e)}")
     finally:
+        cassette.close()
+        write_metrics(prometheus_filename)
         await cleanup()
 
+def add_cassette_arguments(arg_parser):
+    group = arg_parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="DIR", nargs="?", const=CASSETTE_DIRNAME,
+                       help=f"store every response and link verdict in a cassette (default {CASSETTE_DIRNAME}/)")
+    group.add_argument("--replay", metavar="DIR", nargs="?", const=CASSETTE_DIRNAME,
+                       help="rebuild the catalog offline from a recorded cassette into *.replay.json; "
+                            "record with --discovery full so every listing page is in it")
+
+def configure_cassette(args):
+    if args.record:
+        cassette.record_to(args.record)
+    elif args.replay:
+        cassette.replay_from(args.replay)
+
+def add_discovery_argument(arg_parser):
+    arg_parser.add_argument("--discovery", choices=["auto", "sitemap", "full"], default="auto",
+                            help="how new posts are found: sitemaps and feeds since the last run, every category "
+                                 f"page, or auto (sitemaps, with a full pass every {FULL_CRAWL_INTERVAL_DAYS} days)")
+
+def add_parser_arguments(arg_parser):
+    arg_parser.add_argument("--parser", choices=["auto", "lxml", "html.parser"], default="auto",
+                            help="HTML parser backend; auto uses lxml when it is installed")
+    arg_parser.add_argument("--parse-workers", metavar="N", type=int, default=PARSE_WORKERS,
+                            help="processes that parse pages (default one per CPU, 0 parses on the event loop)")
+
+def configure_parser(args):
+    # Before the engine starts the pool, which hands its backend to the workers.
+    use_backend(args.parser)
+    parser.workers = args.parse_workers
+
+def add_log_arguments(arg_parser):
+    arg_parser.add_argument("--quiet", action="store_true",
+                            help="only print warnings, errors and a periodic progress summary")
+    arg_parser.add_argument("--log-level", choices=list(LEVELS), default="info", help="lowest level that is logged")
+    arg_parser.add_argument("--log-file", metavar="FILE", help="also append every record as JSON lines to FILE")
+
 def main():
+    arg_parser = argparse.ArgumentParser(description="Scrape repack-games.com into a Hydra source")
+    arg_parser.add_argument("--resume", action="store_true",
+                            help=f"continue from the last checkpoint in {CHECKPOINT_FILENAME}")
+    arg_parser.add_argument("--metrics", action="store_true",
+                            help=f"record per-stage and per-host timings and write them to {METRICS_FILENAME}")
+    arg_parser.add_argument("--prometheus", metavar="FILE",
+                            help="also write the metrics in Prometheus text format (implies --metrics)")
+    arg_parser.add_argument("--shard", metavar="I/N", type=parse_shard,
+                            help="crawl only shard I of N and write a partial source for --merge-shards")
+    add_discovery_argument(arg_parser)
+    arg_parser.add_argument("--early-stop", metavar="K", type=int, default=EARLY_STOP_PAGES,
+                            help="stop paginating a category after K listing pages in a row with nothing new "
+                                 f"(default {EARLY_STOP_PAGES}, 0 walks every page)")
+    add_cassette_arguments(arg_parser)
+    add_parser_arguments(arg_parser)
+    arg_parser.add_argument("--merge-shards", metavar="N", type=int,
+                            help=f"merge the results of shards 1..N into {JSON_FILENAME} and exit")
+    add_log_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    if args.metrics or args.prometheus:
+        metrics.enable()
+    log.configure(args.log_level, args.quiet, args.log_file)
+    configure_cassette(args)
+    configure_parser(args)
+
+    if args.merge_shards:
+        try:
+            merge_shards(args.merge_shards)
+        finally:
+            log.close()
+        return
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     
     try:
-        loop.run_until_complete(scrape_games())
+        loop.run_until_complete(scrape_games(args.resume, args.prometheus, args.shard, args.discovery,
+                                             args.early_stop))
     except KeyboardInterrupt:
         print("\nScript interrupted by user.")
     except Exception as e:
@@ -473,6 +1025,7 @@ def main():
             pass
             
         loop.close()
+        log.close()
         print("Script terminated.")
         
 if __name__ == "__main__":
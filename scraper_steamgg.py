@@ -1,17 +1,23 @@
-import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime
 import re
-import time
 from colorama import Fore, init
+from engine import Engine, SiteAdapter, write_source
+from files import atomic_write
+from logs import log
+from parsing import make_soup
+from titles import normalize_title
 
 init(autoreset=True)
 
 BASE_URL = "https://steamgg.net"
 JSON_FILENAME = "hydra_source_full.json"
-CONCURRENT_REQUESTS = 10
+SOURCE_NAME = "Hydra Source"
+LINKS_FILENAME = "text.html"
+REDIRECT_CACHE_FILENAME = "redirect_cache.json"
+REDIRECT_DELAY_SECONDS = 5
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/109.0",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -30,44 +36,63 @@ VALID_LINK_PATTERNS = [
     r"(https?://.*?datanodes\.to\/download)",  # Páginas de redirecionamento como Datanodes
 ]
 
-def normalize_title(title):
-    """Remove informações adicionais do título."""
-    REGEX_TITLE = r"(?:\(.*?\)|\s*(Free Download|v\d+(\.\d+)*[a-zA-Z0-9\-]*|Build \d+|P2P|GOG|Repack|Edition.*|FLT|TENOKE)\s*)"
-    return re.sub(REGEX_TITLE, "", title).strip()
+def extract_direct_links(page_content):
+    """Extrai os links diretos de uma página de redirecionamento."""
+    soup = make_soup(page_content)
+    return [a['href'] for a in soup.select("a[href]") if re.search(r"(https?://.*?\.(zip|rar|7z))", a['href'])]
 
-async def fetch_page(session, url):
-    """Faz a requisição de uma página."""
-    try:
-        async with session.get(url, headers=HEADERS) as response:
-            if response.status == 200:
-                return await response.text()
-            print(f"{Fore.RED}Erro ao acessar {url}: {response.status}")
-            return None
-    except Exception as e:
-        print(f"{Fore.RED}Erro ao buscar {url}: {str(e)}")
-        return None
-
-async def fetch_redirect_page(session, redirect_url):
+async def fetch_redirect_page(engine, redirect_url):
     """Resolve links de páginas intermediárias de download (como datanodes)."""
-    print(f"{Fore.CYAN}Seguindo redirecionamento para: {redirect_url}{Fore.RESET}")
-    try:
-        async with session.get(redirect_url, headers=HEADERS) as response:
-            if response.status == 200:
-                page_content = await response.text()
-                soup = BeautifulSoup(page_content, 'html.parser')
-
-                # Procurar o link de redirecionamento final (esperar 5 segundos ou usar uma abordagem de tempo)
-                time.sleep(5)  # Simula a espera de 5 segundos antes de clicar em "Continue"
+    log.debug(f"Seguindo redirecionamento para: {redirect_url}", color=Fore.CYAN)
+    page_content = await engine.fetch_page(redirect_url, HEADERS)
+    if not page_content:
+        log.warning(f"Erro ao seguir redirecionamento {redirect_url}", "redirect_error", Fore.RED, url=redirect_url)
+        return None
 
-                # Buscar links de download
-                download_links = [a['href'] for a in soup.select("a[href]") if re.search(r"(https?://.*?\.(zip|rar|7z))", a['href'])]
-                return download_links
-            else:
-                print(f"{Fore.RED}Erro ao acessar página de redirecionamento: {redirect_url} ({response.status}){Fore.RESET}")
-                return []
-    except Exception as e:
-        print(f"{Fore.RED}Erro ao seguir redirecionamento {redirect_url}: {str(e)}{Fore.RESET}")
-        return []
+    # Simula a espera antes de clicar em "Continue" sem bloquear o loop nem
+    # ocupar uma vaga de conexão, então as esperas correm em paralelo.
+    await asyncio.sleep(REDIRECT_DELAY_SECONDS)
+
+    # Buscar links de download
+    return await engine.parse(extract_direct_links, page_content)
+
+class RedirectResolver:
+    """Resolve redirecionamentos em paralelo, com cache persistente dos links diretos."""
+
+    def __init__(self, engine, filename=REDIRECT_CACHE_FILENAME):
+        self.engine = engine
+        self.filename = filename
+        self.cache = {}
+        self.in_flight = {}
+
+    def load(self):
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.cache = {}
+        return self
+
+    def save(self):
+        atomic_write(self.filename, json.dumps(self.cache, ensure_ascii=False))
+
+    async def resolve(self, redirect_url):
+        """Retorna os links diretos de um redirecionamento, resolvendo cada URL uma única vez."""
+        if redirect_url in self.cache:
+            return self.cache[redirect_url]
+        if redirect_url not in self.in_flight:
+            self.in_flight[redirect_url] = asyncio.ensure_future(
+                fetch_redirect_page(self.engine, redirect_url))
+        direct_links = await self.in_flight[redirect_url]
+        self.in_flight.pop(redirect_url, None)
+        if direct_links is None:
+            return []
+        self.cache[redirect_url] = direct_links
+        return direct_links
+
+    async def resolve_all(self, redirect_urls):
+        results = await asyncio.gather(*(self.resolve(url) for url in redirect_urls))
+        return [link for direct_links in results for link in direct_links]
 
 def filter_links(links):
     """Filtra apenas os links relevantes."""
@@ -79,14 +104,9 @@ def filter_links(links):
                 break
     return filtered_links
 
-async def get_game_details(session, game_url):
-    """Coleta detalhes de um jogo específico."""
-    print(f"{Fore.CYAN}Coletando detalhes do jogo: {game_url}{Fore.RESET}")
-    page_content = await fetch_page(session, game_url)
-    if not page_content:
-        return None
-
-    soup = BeautifulSoup(page_content, 'html.parser')
+def extract_game_page(page_content):
+    """Extrai título, links e tamanho da página de um jogo."""
+    soup = make_soup(page_content)
 
     # Nome do jogo
     title_element = soup.select_one("div.blog-content-title h2")
@@ -97,16 +117,24 @@ async def get_game_details(session, game_url):
     all_links = [a['href'] for a in soup.select("a[href]") if a['href'].startswith("http")]
     download_links = filter_links(all_links)
 
-    # Se algum link for uma página de redirecionamento, seguimos para pegar o link direto
-    redirect_links = [link for link in download_links if "datanodes.to/download" in link]
-    for redirect_link in redirect_links:
-        direct_links = await fetch_redirect_page(session, redirect_link)
-        download_links.extend(direct_links)
-
     # Tamanho do arquivo (se disponível)
     size_match = re.search(r"(\d+(\.\d+)?)\s*(GB|MB)", page_content, re.IGNORECASE)
     file_size = f"{size_match.group(1)} {size_match.group(3)}" if size_match else "Desconhecido"
 
+    return title, download_links, file_size
+
+async def get_game_details(engine, resolver, game_url):
+    """Coleta detalhes de um jogo específico."""
+    log.debug(f"Coletando detalhes do jogo: {game_url}", color=Fore.CYAN)
+    details = await engine.fetch_extracted(game_url, extract_game_page, headers=HEADERS)
+    if not details:
+        return None
+    title, download_links, file_size = details
+
+    # Se algum link for uma página de redirecionamento, seguimos para pegar o link direto
+    redirect_links = [link for link in download_links if "datanodes.to/download" in link]
+    download_links.extend(await resolver.resolve_all(redirect_links))
+
     # Data de upload
     upload_date = datetime.now().isoformat()
 
@@ -119,23 +147,37 @@ async def get_game_details(session, game_url):
         }
     return None
 
-async def scrape_games(game_links):
-    """Coleta os dados de todos os jogos."""
-    async with aiohttp.ClientSession() as session:
-        all_data = {"name": "Hydra Source", "downloads": []}
-        tasks = [get_game_details(session, game_url) for game_url in game_links]
-        games = await asyncio.gather(*tasks)
+class SteamGGAdapter(SiteAdapter):
+    """steamgg.net: páginas de jogos listadas em um arquivo HTML local."""
+    name = "steamgg"
+
+    def __init__(self, game_links):
+        self.game_links = game_links
+
+    async def run(self, engine):
+        """Coleta os dados de todos os jogos."""
+        resolver = RedirectResolver(engine).load()
+        all_data = {"name": SOURCE_NAME, "downloads": []}
+        tasks = [get_game_details(engine, resolver, game_url) for game_url in self.game_links]
+        try:
+            games = await asyncio.gather(*tasks)
+        finally:
+            resolver.save()
 
         for game in games:
             if game:
                 all_data["downloads"].append(game)
-                print(f"{Fore.GREEN}[JOGO ADICIONADO] {game['title']}{Fore.RESET}")
+                log.info(f"[JOGO ADICIONADO] {game['title']}", "steamgg_added", Fore.GREEN, title=game["title"])
             else:
-                print(f"{Fore.RED}[SEM LINKS] Jogo ignorado.{Fore.RESET}")
+                log.info("[SEM LINKS] Jogo ignorado.", "steamgg_no_links", Fore.RED)
 
-        with open(JSON_FILENAME, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, ensure_ascii=False, indent=4)
-        print(f"{Fore.GREEN}Dados salvos em {JSON_FILENAME}.{Fore.RESET}")
+        write_source(JSON_FILENAME, all_data["name"], all_data["downloads"])
+        log.info(f"Dados salvos em {JSON_FILENAME}.", color=Fore.GREEN)
+
+async def scrape_games(game_links):
+    """Coleta os dados de todos os jogos."""
+    async with Engine() as engine:
+        await engine.run(SteamGGAdapter(game_links))
 
 def load_game_links(file_path):
     """Carrega os links de jogos de um arquivo HTML."""
@@ -144,9 +186,12 @@ def load_game_links(file_path):
     return [a["href"] for a in soup.select("a[href^='https://steamgg.net/']")]
 
 def main():
-    game_links = load_game_links("text.html")  # Substitua pelo caminho correto
+    game_links = load_game_links(LINKS_FILENAME)  # Substitua pelo caminho correto
     print(f"{Fore.CYAN}Total de jogos encontrados: {len(game_links)}{Fore.RESET}")
-    asyncio.run(scrape_games(game_links))
+    try:
+        asyncio.run(scrape_games(game_links))
+    finally:
+        log.close()
 
 if __name__ == "__main__":
     main()
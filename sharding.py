@@ -0,0 +1,42 @@
+import os
+import zlib
+from frontier import canonicalize_url
+
+
+class Shard:
+    # One of `count` deterministic slices of a crawl. Work is assigned by a
+    # CRC32 of its key (a canonical listing URL, a normalized title), so every
+    # run and every process agrees on the owner without coordinating, and a
+    # shard sees the same pages from one run to the next.
+    def __init__(self, index, count):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"invalid shard {index}/{count}")
+        self.index = index
+        self.count = count
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    def owns(self, key):
+        return zlib.crc32(key.encode("utf-8")) % self.count == self.index - 1
+
+    def owns_url(self, url):
+        return self.owns(canonicalize_url(url))
+
+    def filename(self, filename):
+        # shisuyssource.json -> shisuyssource.shard-2-of-4.json
+        stem, ext = os.path.splitext(filename)
+        return f"{stem}.shard-{self.index}-of-{self.count}{ext}"
+
+
+def parse_shard(text):
+    # "2/4" -> Shard(2, 4); shards are numbered from 1 like matrix job indexes.
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"expected a shard as i/N, got {text!r}")
+    return Shard(index, count)
+
+
+def shard_filenames(filename, count):
+    return [Shard(index, count).filename(filename) for index in range(1, count + 1)]
@@ -0,0 +1,54 @@
+import codecs
+
+CHUNK_SIZE = 16384
+PAGE_BYTE_CAP = 4 * 1024 * 1024
+VALIDATION_BYTE_CAP = 1024 * 1024
+
+
+class MarkerMatcher:
+    # Case-insensitive search for any marker across chunk boundaries, keeping
+    # only enough of the previous chunk to catch a marker split between two.
+    def __init__(self, markers):
+        self.markers = [marker.lower() for marker in markers]
+        self.overlap = max(len(marker) for marker in self.markers) - 1
+        self.tail = ""
+        self.found = None
+
+    def feed(self, text):
+        window = self.tail + text.lower()
+        for marker in self.markers:
+            if marker in window:
+                self.found = marker
+                return True
+        self.tail = window[-self.overlap:] if self.overlap else ""
+        return False
+
+
+def _decoder(response):
+    try:
+        return codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+async def read_text(response, max_bytes, markers=()):
+    # Reads the body chunk by chunk, stopping (and closing the connection) once
+    # max_bytes have been read or one of the markers shows up. Returns the text
+    # read so far and the marker that ended the read, if any.
+    decoder = _decoder(response)
+    matcher = MarkerMatcher(markers) if markers else None
+    parts = []
+    size = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        chunk = chunk[:max_bytes - size]
+        size += len(chunk)
+        text = decoder.decode(chunk)
+        parts.append(text)
+        if matcher is not None and matcher.feed(text):
+            response.close()
+            return "".join(parts), matcher.found
+        if size >= max_bytes:
+            response.close()
+            break
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), None
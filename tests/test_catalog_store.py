@@ -0,0 +1,83 @@
+import gzip
+import json
+import scraper
+from catalog_store import CatalogStore
+from engine import write_source
+from output import publish
+
+
+def entry(title, uri):
+    return {"title": title, "uris": [uri], "fileSize": "2 GB", "uploadDate": "2024-01-01T00:00:00"}
+
+
+def test_save_writes_only_changed_and_removed_entries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_source("source.json", scraper.SOURCE_NAME, [entry("Game A", "https://pixeldrain.com/u/a"),
+                                                      entry("Game B", "https://pixeldrain.com/u/b"),
+                                                      entry("Game C", "https://pixeldrain.com/u/c")])
+    store = CatalogStore().open()
+    try:
+        data = scraper.load_existing_data(store, "source.json")
+        catalog = scraper.CatalogIndex(data["downloads"], stored=True)
+        assert catalog.changes(data["downloads"]) == ([], set())
+
+        game_a, game_b, game_c = data["downloads"]
+        game_a.set_uris(["https://pixeldrain.com/u/a2"])
+        kept = [game_a, game_b]
+        changed, removed = catalog.changes(kept)
+        assert changed == [game_a]
+        assert removed == {catalog.key_of(game_c)}
+
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+        store.apply([game.to_entry() for game in changed], removed)
+        store.conn.set_trace_callback(None)
+        assert not any("Game B" in statement for statement in statements)
+        assert [game["uris"] for game in store.entries()] == [["https://pixeldrain.com/u/a2"],
+                                                              ["https://pixeldrain.com/u/b"]]
+    finally:
+        store.close()
+
+
+def test_bootstrap_normalizes_so_full_sync_publishes_no_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_source("source.json", scraper.SOURCE_NAME, [
+        {"title": "Game A", "uris": ["https://pixeldrain.com/u/a"], "fileSize": "8192 MB",
+         "uploadDate": "2024-01-01T10:20:30.123456"},
+        {"title": "Game B", "uris": ["https://pixeldrain.com/u/b"], "fileSize": "Desconhecido", "uploadDate": None},
+    ])
+    store = CatalogStore().open()
+    try:
+        data = scraper.load_existing_data(store, "source.json")
+        assert [game["fileSize"] for game in store.entries()] == ["8 GB", "Undefined"]
+        scraper.save_data(store, "source.json", data)
+        data = scraper.load_existing_data(store, "source.json")
+        scraper.save_data(store, "source.json", data)
+        with open("source.delta.json", 'r', encoding='utf-8') as f:
+            delta = json.load(f)
+        assert (delta["added"], delta["updated"], delta["removed"]) == ([], [], [])
+    finally:
+        store.close()
+
+
+def test_publish_writes_every_variant_in_one_pass(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = CatalogStore().open()
+    try:
+        store.upsert([entry("Game B", "https://pixeldrain.com/u/b"), entry("Jogo Á", "https://pixeldrain.com/u/a")])
+        publish(store, "source.json", scraper.SOURCE_NAME)
+        store.upsert([entry("Game C", "https://pixeldrain.com/u/c")])
+        delta = publish(store, "source.json", scraper.SOURCE_NAME)
+        with open("source.json", 'rb') as f:
+            published = f.read()
+        data = json.loads(published)
+        assert published == json.dumps(data, ensure_ascii=False, indent=4).encode("utf-8")
+        with open("source.min.json", 'rb') as f:
+            minified = f.read()
+        assert minified == json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with gzip.open("source.min.json.gz", 'rb') as f:
+            assert f.read() == minified
+        assert [game["title"] for game in data["downloads"]] == ["Game B", "Game C", "Jogo Á"]
+        assert (delta["count"], delta["added"], delta["updated"], delta["removed"]) == (3, ["Game C"], [], [])
+    finally:
+        store.close()
@@ -0,0 +1,69 @@
+import asyncio
+import discovery
+from discovery import extract_feed, extract_sitemap, fetch_changed_posts
+
+SITE = discovery.SITE_URL
+SINCE = 1700000000
+OLD = "2023-01-01T00:00:00+00:00"
+NEW = "2024-06-01T00:00:00+00:00"
+
+
+def index(*children):
+    return ('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(f"<sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>" for loc, lastmod in children)
+            + "</sitemapindex>")
+
+
+def urlset(*urls):
+    return ('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(f"<url><loc>{loc}</loc>" + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "") + "</url>"
+                      for loc, lastmod in urls)
+            + "</urlset>")
+
+
+def feed(*items):
+    return ('<rss><channel>' + "".join(f"<item><link>{link}</link><pubDate>{date}</pubDate></item>"
+                                       for link, date in items) + "</channel></rss>")
+
+
+class FakeEngine:
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def fetch_extracted(self, url, extract, validators=None):
+        return extract(self.pages[url]) if url in self.pages else None
+
+
+def changed_posts(pages, sitemap_urls, feed_urls=()):
+    return asyncio.run(fetch_changed_posts(FakeEngine(pages), SINCE, sitemap_urls=list(sitemap_urls),
+                                           feed_urls=list(feed_urls)))
+
+
+def test_dated_index_with_undated_post_sitemap_falls_back():
+    pages = {f"{SITE}/index.xml": index((f"{SITE}/post-sitemap.xml", NEW)),
+             f"{SITE}/post-sitemap.xml": urlset((f"{SITE}/game-a/", None))}
+    assert changed_posts(pages, [f"{SITE}/index.xml"]) is None
+
+
+def test_dated_post_sitemap_lists_changed_posts():
+    pages = {f"{SITE}/index.xml": index((f"{SITE}/post-sitemap.xml", NEW), (f"{SITE}/post-sitemap2.xml", OLD)),
+             f"{SITE}/post-sitemap.xml": urlset((f"{SITE}/game-a/", NEW), (f"{SITE}/game-b/", OLD))}
+    assert changed_posts(pages, [f"{SITE}/index.xml"]) == [f"{SITE}/game-a/"]
+
+
+def test_index_with_only_unchanged_children_means_nothing_changed():
+    pages = {f"{SITE}/index.xml": index((f"{SITE}/post-sitemap.xml", OLD))}
+    assert changed_posts(pages, [f"{SITE}/index.xml"]) == []
+
+
+def test_feed_alone_needs_to_reach_back_to_since():
+    overflowed = {f"{SITE}/feed/": feed((f"{SITE}/game-a/", "Sat, 01 Jun 2024 00:00:00 +0000"))}
+    assert changed_posts(overflowed, [f"{SITE}/missing.xml"], [f"{SITE}/feed/"]) is None
+    covering = {f"{SITE}/feed/": feed((f"{SITE}/game-a/", "Sat, 01 Jun 2024 00:00:00 +0000"),
+                                      (f"{SITE}/game-b/", "Sun, 01 Jan 2023 00:00:00 +0000"))}
+    assert changed_posts(covering, [f"{SITE}/missing.xml"], [f"{SITE}/feed/"]) == [f"{SITE}/game-a/"]
+
+
+def test_extractors_read_sitemaps_and_feeds():
+    assert extract_sitemap(urlset((f"{SITE}/game-a/", NEW))) == ([], [[f"{SITE}/game-a/", NEW]])
+    assert extract_feed(feed((f"{SITE}/game-a/", "Sat, 01 Jun 2024 00:00:00 +0000")))[0][0] == f"{SITE}/game-a/"
@@ -0,0 +1,6 @@
+from frontier import canonicalize_url
+
+
+def test_only_tracking_params_are_dropped():
+    assert (canonicalize_url("http://www.Repack-Games.com/game/?utm_source=x&ref=home&refresh=1&fbclid=abc")
+            == "https://repack-games.com/game?refresh=1")
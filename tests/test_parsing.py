@@ -0,0 +1,88 @@
+import asyncio
+import os
+import pytest
+import parsing
+from parsing import ParseExecutor, resolve_backend
+from records import parse_timestamp
+from scraper import extract_game_details, extract_last_page_num, extract_listing_items, extract_qiwi_size
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BACKENDS = ["html.parser", "lxml"]
+# Relative upload dates are resolved against datetime.now(), so runs of the
+# same page may differ by the time between them.
+DATE_TOLERANCE_SECONDS = 5
+
+CASES = [
+    ("game_page.html", extract_game_details),
+    ("game_page_1fichier_only.html", extract_game_details),
+    ("listing_page.html", extract_listing_items),
+    ("category_page.html", extract_last_page_num),
+    ("qiwi_page.html", extract_qiwi_size),
+]
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def extract_with(monkeypatch, backend, workers, extract, page_content):
+    monkeypatch.setattr(parsing, "SOUP_BACKEND", resolve_backend(backend))
+    executor = ParseExecutor(workers).start()
+    try:
+        return asyncio.run(executor.run(extract, page_content))
+    finally:
+        executor.close()
+
+
+def split_upload_date(extract, result):
+    if extract is not extract_game_details:
+        return result, None
+    title, size, links, upload_date = result
+    return (title, size, links), parse_timestamp(upload_date)
+
+
+@pytest.mark.parametrize("fixture, extract", CASES, ids=[name for name, _ in CASES])
+def test_backends_and_pool_agree(monkeypatch, fixture, extract):
+    page_content = read_fixture(fixture)
+    expected, expected_date = split_upload_date(extract, extract_with(monkeypatch, "html.parser", 0, extract,
+                                                                      page_content))
+    for backend in BACKENDS:
+        for workers in (0, 2):
+            result, date = split_upload_date(extract, extract_with(monkeypatch, backend, workers, extract,
+                                                                   page_content))
+            assert result == expected, f"{backend} with {workers} workers"
+            if expected_date is not None:
+                assert abs(date - expected_date) <= DATE_TOLERANCE_SECONDS
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fixture_values(monkeypatch, backend):
+    monkeypatch.setattr(parsing, "SOUP_BACKEND", resolve_backend(backend))
+    title, size, links, upload_date = extract_game_details(read_fixture("game_page.html"))
+    assert title == "Hollow Depths Free Download (v1.2.3)"
+    assert size == "12.5 GB"
+    assert links == ["https://1fichier.com/?abc123def456", "https://qiwi.gg/file/Xy7Hq-HollowDepths",
+                     "https://pixeldrain.com/u/PdA1b2C3"]
+    assert upload_date is not None
+    assert extract_game_details(read_fixture("game_page_1fichier_only.html"))[2] == []
+    assert extract_listing_items(read_fixture("listing_page.html")) == [
+        ["https://repack-games.com/hollow-depths/", "Hollow Depths Free Download (v1.2.3)", "3 days ago"],
+        ["https://repack-games.com/star-courier/", "Star Courier Free Download", "1 month ago"],
+        ["https://repack-games.com/tiny-tactics/", "Tiny Tactics Free Download", None],
+    ]
+    assert extract_last_page_num(read_fixture("category_page.html")) == 154
+    assert extract_qiwi_size(read_fixture("qiwi_page.html")) == "12.50 GB"
+
+
+def test_pool_uses_parent_backend(monkeypatch):
+    monkeypatch.setattr(parsing, "SOUP_BACKEND", "html.parser")
+    executor = ParseExecutor(1).start()
+    try:
+        assert executor._pool.submit(current_backend).result() == "html.parser"
+    finally:
+        executor.close()
+
+
+def current_backend():
+    return parsing.SOUP_BACKEND
@@ -0,0 +1,42 @@
+import asyncio
+from engine import Engine
+from hosts import HostLimiter
+from pixeldrain import PixeldrainBatcher
+
+
+class FakeResponse:
+    def __init__(self, status, data=None):
+        self.status = status
+        self.headers = {"Retry-After": "0"}
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def json(self, content_type=None):
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        return self.responses.pop(0)
+
+
+def test_throttled_batch_is_retried_and_counted_as_failure():
+    async def run():
+        engine = Engine()
+        engine.limiter = HostLimiter()
+        engine.session = FakeSession([FakeResponse(503), FakeResponse(200, {"id": "abc", "size": 1})])
+        infos = await PixeldrainBatcher(engine)._fetch(["abc"])
+        return infos, engine.limiter.total
+
+    infos, limit = asyncio.run(run())
+    assert infos == {"abc": {"id": "abc", "size": 1}}
+    assert limit.requests == 2
+    assert limit._failures == 1
@@ -0,0 +1,15 @@
+import asyncio
+from rejections import RejectionLog
+
+
+def test_lone_rejection_is_flushed_by_the_timer(tmp_path):
+    rejections = RejectionLog(str(tmp_path / "invalid.jsonl"), interval=0.01)
+
+    async def run():
+        rejections.add("Game A", "All links invalid")
+        assert rejections.pending
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert not rejections.pending
+    assert [game["title"] for game in RejectionLog(rejections.filename).entries()] == ["Game A"]
@@ -0,0 +1,26 @@
+import json
+import scraper
+from engine import write_source
+from sharding import Shard
+from titles import normalize_title
+
+
+def entry(title, uploaded):
+    return {"title": title, "uris": [f"https://pixeldrain.com/u/{normalize_title(title)}"], "fileSize": "1 GB",
+            "uploadDate": uploaded}
+
+
+def test_merge_drops_untouched_copy_crawled_by_another_shard(tmp_path, monkeypatch):
+    # Shard 2 crawled a newer "Game X" that failed validation, so its partial
+    # lists the key as crawled without the game; shard 1 owns the title and
+    # kept its old copy. A single run would have removed it.
+    monkeypatch.chdir(tmp_path)
+    write_source(Shard(1, 2).filename(scraper.JSON_FILENAME), scraper.SOURCE_NAME,
+                 [entry("Game X", "2024-01-01T00:00:00"), entry("Game Y", "2024-01-01T00:00:00")], crawled=[])
+    write_source(Shard(2, 2).filename(scraper.JSON_FILENAME), scraper.SOURCE_NAME,
+                 [entry("Game Z", "2024-02-01T00:00:00")], crawled=[normalize_title("Game X"),
+                                                               normalize_title("Game Z")])
+    scraper.merge_shards(2)
+    with open(scraper.JSON_FILENAME, 'r', encoding='utf-8') as f:
+        titles = [game["title"] for game in json.load(f)["downloads"]]
+    assert titles == ["Game Y", "Game Z"]
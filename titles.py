@@ -0,0 +1,8 @@
+import re
+
+REGEX_TITLE = r"(?:\(.*?\)|\s*(Free Download|v\d+(\.\d+)*[a-zA-Z0-9\-]*|Build \d+|P2P|GOG|Repack|Edition.*|FLT|TENOKE)\s*)"
+TITLE_PATTERN = re.compile(REGEX_TITLE)
+
+
+def normalize_title(title):
+    return TITLE_PATTERN.sub("", title).strip()